@@ -2,14 +2,125 @@
 Entrypoint for running the Xetra ETL application
 """
 import argparse
+import hashlib
+import json
 import logging 
 import logging.config
+import os
+import pickle
+import stat
+from pathlib import Path
+from typing import BinaryIO
 
 import yaml
 
 from xetra_code.common.s3 import S3BucketConnector
 from xetra_code.transformers.xetra_transformers import XetraETL, XetraSourceConfig, XetraTargetConfig
 
+# libyaml's C loader is much faster than the pure Python one, fall back if it is missing
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Hash of the logging configuration that is currently applied
+_LOG_CONFIG_HASH = None
+
+# The config cache holds the s3 credentials and gets unpickled, so only its owner can access it
+_CACHE_FILE_MODE = 0o600
+# Opening the config cache does not follow a symlink planted in its place
+_CACHE_OPEN_FLAGS = getattr(os, "O_NOFOLLOW", 0)
+
+
+def _read_config_cache(cache_file: Path, config_stat: os.stat_result):
+    """
+    Reads the pickled configuration cache
+
+    The cache is refused if it is not owned by the owner of the YAML file
+    or if other users can access it, since unpickling it can run arbitrary code
+
+    :param cache_file: path of the pickle file next to the YAML file
+    :param config_stat: result of os.fstat on the YAML file
+
+    returns:
+      cached: tuple of the YAML modification time and the parsed configuration
+    """
+    with open(os.open(cache_file, os.O_RDONLY | _CACHE_OPEN_FLAGS), "rb") as cache:
+        cache_stat = os.fstat(cache.fileno())
+        if cache_stat.st_uid != config_stat.st_uid or cache_stat.st_mode & 0o077:
+            raise PermissionError(f"Refusing to load the config cache {cache_file}")
+        return pickle.load(cache)
+
+
+def _write_config_cache(cache_file: Path, cached: tuple):
+    """
+    Writes the pickled configuration cache, readable and writable only by its owner
+
+    :param cache_file: path of the pickle file next to the YAML file
+    :param cached: tuple of the YAML modification time and the parsed configuration
+    """
+    cache_fd = os.open(
+        cache_file,
+        os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _CACHE_OPEN_FLAGS,
+        _CACHE_FILE_MODE,
+    )
+    with open(cache_fd, "wb") as cache:
+        # os.open only applies the mode when it creates the file
+        os.fchmod(cache.fileno(), _CACHE_FILE_MODE)
+        pickle.dump(cached, cache, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_config(config_file: BinaryIO):
+    """
+    Loads the YAML configuration file
+
+    The parsed configuration is cached in a pickle file next to the YAML file
+    and reused as long as the modification time of the YAML file is unchanged.
+    Only the owner of the YAML file can read or write the cache.
+    Input that is not a regular file, e.g stdin, is parsed without the cache
+
+    :param config_file: configuration file in YAML format opened in binary mode
+
+    returns:
+      config: dictionary with the parsed configuration
+    """
+    config_stat = os.fstat(config_file.fileno())
+    if not stat.S_ISREG(config_stat.st_mode):
+        # e.g stdin or a pipe, which has no file to keep a cache next to
+        return yaml.load(config_file, Loader=_YAML_LOADER)
+    cache_file = Path(f"{config_file.name}.pkl")
+    config_mtime = config_stat.st_mtime_ns
+    try:
+        cached_mtime, config = _read_config_cache(cache_file, config_stat)
+        if cached_mtime == config_mtime:
+            return config
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        # No usable cache -> parse the YAML file below
+        pass
+    config = yaml.load(config_file, Loader=_YAML_LOADER)
+    try:
+        _write_config_cache(cache_file, (config_mtime, config))
+    except OSError:
+        # The cache is only an optimisation, e.g. the config directory can be read-only
+        pass
+    return config
+
+
+def configure_logging(log_config: dict):
+    """
+    Configures logging from the logging section of the configuration
+
+    The handlers are only rebuilt when the configuration differs from the one
+    applied by a previous call, e.g when main() runs repeatedly in one process
+
+    :param log_config: logging configuration in the logging.config dictionary schema
+    """
+    global _LOG_CONFIG_HASH
+    config_hash = hashlib.blake2b(
+        json.dumps(log_config, sort_keys=True, default=str).encode()
+    ).digest()
+    if config_hash != _LOG_CONFIG_HASH:
+        logging.config.dictConfig(log_config)
+        _LOG_CONFIG_HASH = config_hash
+
+
 def main():
     """
     Entrypoint to run the xetra ETL Job
@@ -17,13 +128,15 @@ def main():
     
     # Parsing YAML File
     parser = argparse.ArgumentParser(description="Run the Xetra ETL Job.")
-    parser.add_argument('config', help="A configuration file in YAML format.")
+    parser.add_argument('config', type=argparse.FileType('rb'),
+                        help="A configuration file in YAML format.")
     args = parser.parse_args()
-    config = yaml.safe_load(open(args.config))
+    config = load_config(args.config)
+    args.config.close()
     
     # configure logging
     log_config = config["logging"]
-    logging.config.dictConfig(log_config)
+    configure_logging(log_config)
     logger = logging.getLogger(__name__)
     # reading s3 configuration
     s3_config = config['s3']
@@ -5,67 +5,80 @@ Test the meta process method
 import unittest
 import boto3
 import pandas as pd
+import pyarrow as pa
 
 from moto import mock_aws
 from datetime import datetime, timedelta
+from tests.log_capture import LogCaptureMixin
 from xetra_code.common.s3 import S3BucketConnector
 from xetra_code.common.meta_process import MetaProcess
 from xetra_code.common.constants import MetaProcessFormat
 from xetra_code.common.custom_exceptions import WrongMetaFileException
-from io import StringIO
+from io import BytesIO
 
 
-class TestMetaProcess(unittest.TestCase):
+class TestMetaProcess(LogCaptureMixin, unittest.TestCase):
     """
     Testing the MetaProcess Class
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
         Here we setup the environment and variables for the mock aws
+        once for all the tests of the class
         """
         # First: We initialize/start mocking the aws connection
-        self.mock_s3 = mock_aws()
-        self.mock_s3.start()
+        cls.mock_s3 = mock_aws()
+        cls.mock_s3.start()
 
         # Second: We define the class arguments that will go into the S3BucketConnector
         # Hence imitating the real S3BucketConnector; you can check the arguments in the S3BucketConnector class to confirm
 
-        self.s3_access_key = "AWS_ACCESS_KEY"
-        self.s3_secret_key = "AWS_SECRET_KEY"
-        self.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
-        self.s3_bucket_name = "test-bucket"
+        cls.s3_access_key = "AWS_ACCESS_KEY"
+        cls.s3_secret_key = "AWS_SECRET_KEY"
+        cls.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
+        cls.s3_bucket_name = "test-bucket"
 
         # Third: Initialize an actual s3 service and use the mocked bucket on the mock_aws service
 
-        self.s3 = boto3.resource(service_name="s3", endpoint_url=self.s3_endpoint_url)
+        cls.s3 = boto3.resource(service_name="s3", endpoint_url=cls.s3_endpoint_url)
 
-        self.s3.create_bucket(
-            Bucket=self.s3_bucket_name,
+        cls.s3.create_bucket(
+            Bucket=cls.s3_bucket_name,
             CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
         )
 
-        self.s3_bucket = self.s3.Bucket(self.s3_bucket_name)
+        cls.s3_bucket = cls.s3.Bucket(cls.s3_bucket_name)
 
         # Creating a testing instance
-        self.meta_s3_bucket_conn = S3BucketConnector(
-            self.s3_access_key,
-            self.s3_secret_key,
-            self.s3_endpoint_url,
-            self.s3_bucket_name,
+        cls.meta_s3_bucket_conn = S3BucketConnector(
+            cls.s3_access_key,
+            cls.s3_secret_key,
+            cls.s3_endpoint_url,
+            cls.s3_bucket_name,
         )
 
-        self.dates = [
-            (datetime.today().date() - timedelta(days=day)).strftime(
-                MetaProcessFormat.META_DATE_FORMAT.value
-            )
-            for day in range(8)
-        ]
+        # Today and the 7 days before, starting with today
+        cls.dates = (
+            pd.date_range(end=pd.Timestamp.today().normalize(), periods=8)[::-1]
+            .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+            .tolist()
+        )
 
-    def tearDown(self):
+        # Capturing log records once for the whole class instead of per test
+        cls.start_log_capture()
+
+    @classmethod
+    def tearDownClass(cls):
         # Stopping the mock s3 connection
 
-        self.mock_s3.stop()
+        cls.mock_s3.stop()
+        cls.stop_log_capture()
+
+    def setUp(self):
+        # Every test starts with an empty bucket
+        self.s3_bucket.objects.all().delete()
 
     def test_update_meta_file_no_meta_file(self):
         """
@@ -73,23 +86,19 @@ class TestMetaProcess(unittest.TestCase):
         when there is no meta file
         """
 
-        meta_file_key = "meta_file.csv"
+        meta_file_key = "meta_file.parquet"
         expected_source_date_list = ["2024-08-09", "2024-08-08"]
         expected_processed_date_list = [datetime.today().date()] * 2
         expected_log = f"Old metafile does Not exist, creating and updating meta key file -> {meta_file_key} to the s3 bucket"
         # Method Execution
 
-        with self.assertLogs() as mocked_logs:
-            MetaProcess.update_meta_file(
-                self.meta_s3_bucket_conn, meta_file_key, expected_source_date_list
-            )
+        self._log_handler.buffer.clear()
+        MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_file_key, expected_source_date_list
+        )
 
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[1])
-            # self.assertTrue(
-            #     any(expected_log in log for log in mocked_logs.output),
-            #     f"Expected log '{expected_log}' not found in {mocked_logs.output}"
-            # )
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
 
         # NOW WE HAVE A NEW META FILE THAT ONLY CONTAINS THE DATE PROCESSED NEWLY AND HAS TODAY AS THE PROCESSED DATE
 
@@ -99,30 +108,30 @@ class TestMetaProcess(unittest.TestCase):
             .get()
             .get("Body")
             .read()
-            .decode("utf-8")
         )
-        output_buffer = StringIO(written_data_object)
+        output_buffer = BytesIO(written_data_object)
 
-        df_meta_result = pd.read_csv(output_buffer)
+        df_meta_result = pd.read_parquet(output_buffer)
 
-        # GETTING THE SOURCE DATE FROM THE JUST WRITTEN META FILE
+        # GETTING THE SOURCE DATE FROM THE JUST WRITTEN META FILE, STORED AS DATETIME
         date_list_result = list(
-            df_meta_result[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value]
+            df_meta_result[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value].dt.strftime(
+                MetaProcessFormat.META_DATE_FORMAT.value
+            )
         )
 
         # GETTING THE PROCESSED DATE FROM THE JUST WRITTEN META FILE
-        proc_date_list_result = list(
-            pd.to_datetime(
-                df_meta_result[MetaProcessFormat.META_PROCESS_COL.value]
-            ).dt.date
+        proc_date_list_result = (
+            pa.array(df_meta_result[MetaProcessFormat.META_PROCESS_COL.value])
+            .cast(pa.timestamp("s"))
+            .cast(pa.date32())
+            .to_pylist()
         )
 
         # Test that the values expected and written are the same
         self.assertEqual(date_list_result, expected_source_date_list)
         self.assertEqual(proc_date_list_result, expected_processed_date_list)
 
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_file_key}]})
-
     def test_update_meta_file_empty_date_list(self):
         """
         Tests the update_meta_file method
@@ -135,12 +144,12 @@ class TestMetaProcess(unittest.TestCase):
         date_list = []
         meta_key = "meta_file.csv"
         # Method execution
-        with self.assertLogs() as mocked_logs:
-            result = MetaProcess.update_meta_file(
-                self.meta_s3_bucket_conn, meta_key, date_list
-            )
-            # Log test after method execution
-            self.assertIn(log_exp, mocked_logs.output[0])
+        self._log_handler.buffer.clear()
+        result = MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_key, date_list
+        )
+        # Log test after method execution
+        self.assertLogged(log_exp)
         # Test after method execution
         self.assertEqual(return_exp, result)
 
@@ -167,8 +176,6 @@ class TestMetaProcess(unittest.TestCase):
             MetaProcess.update_meta_file(
                 self.meta_s3_bucket_conn, meta_key, date_list_new
             )
-        # Cleanup after test
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_key}]})
 
     def test_update_meta_file_ok(self):
         """
@@ -184,48 +191,177 @@ class TestMetaProcess(unittest.TestCase):
 
         # Test init
         meta_key = "meta_file"
-        meta_file_content = (
-            f"{MetaProcessFormat.META_SOURCE_DATE_COLUMN.value},"
-            f"{MetaProcessFormat.META_PROCESS_COL.value}\n"
-            f"{date_list_old[0]},"
-            f"{datetime.today().strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value)}\n"
-            f"{date_list_old[1]},"
-            f"{datetime.today().strftime(MetaProcessFormat.META_PROCESS_DATE_FORMAT.value)}"
-        )
+        meta_file_content = BytesIO()
+        pd.DataFrame(
+            {
+                MetaProcessFormat.META_SOURCE_DATE_COLUMN.value: date_list_old,
+                MetaProcessFormat.META_PROCESS_COL.value: datetime.today().strftime(
+                    MetaProcessFormat.META_PROCESS_DATE_FORMAT.value
+                ),
+            }
+        ).to_parquet(meta_file_content, index=False)
         expected_log = f"Old and new metafile exists -> Updating meta key file -> {meta_key} to the s3 bucket"
         # result_exp = True
 
         # Lets insert/simulate an existing metafile with the metafile content above
-        self.s3_bucket.put_object(Body=meta_file_content, Key=meta_key)
+        self.s3_bucket.put_object(Body=meta_file_content.getvalue(), Key=meta_key)
 
         # Method Execution
 
-        with self.assertLogs() as mocked_logs:
-            MetaProcess.update_meta_file(
-                self.meta_s3_bucket_conn, meta_key, date_list_new
-            )
+        self._log_handler.buffer.clear()
+        MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_key, date_list_new
+        )
 
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[1])
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
 
         # Now to confirm that we successfully updated the metafile,
         # we need to crosscheck the final output after writing
 
         # Read Meta file
-        meta_df = self.meta_s3_bucket_conn.read_csv_to_df_ok(meta_key)
+        meta_df = self.meta_s3_bucket_conn.read_parquet_to_df(meta_key)
         meta_date_list_result = list(
-            meta_df[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value]
+            meta_df[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value].dt.strftime(
+                MetaProcessFormat.META_DATE_FORMAT.value
+            )
         )
-        meta_processed_date_result = list(
-            pd.to_datetime(meta_df[MetaProcessFormat.META_PROCESS_COL.value]).dt.date
+        meta_processed_date_result = (
+            pa.array(meta_df[MetaProcessFormat.META_PROCESS_COL.value])
+            .cast(pa.timestamp("s"))
+            .cast(pa.date32())
+            .to_pylist()
         )
 
         # Now lets Crosscheck with our expectations
         self.assertEqual(expected_combined_date_list, meta_date_list_result)
         self.assertEqual(expected_compined_processed_date, meta_processed_date_result)
 
-        # Cleanup after test
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_key}]})
+    def test_update_meta_file_csv_meta_file(self):
+        """
+        Tests the update_meta_file method when the meta key is a .csv key
+        and confirms that the meta file is still written as csv
+        """
+
+        # Expected results
+        date_list_old = ["2021-04-12", "2021-04-13"]
+        date_list_new = ["2021-04-16", "2021-04-17"]
+        expected_combined_date_list = date_list_old + date_list_new
+
+        # Test init
+        meta_key = "meta_file.csv"
+        processed_date = datetime.today().strftime(
+            MetaProcessFormat.META_PROCESS_DATE_FORMAT.value
+        )
+        meta_file_content = (
+            f"{MetaProcessFormat.META_SOURCE_DATE_COLUMN.value},"
+            f"{MetaProcessFormat.META_PROCESS_COL.value}\n"
+            f"{date_list_old[0]},{processed_date}\n"
+            f"{date_list_old[1]},{processed_date}"
+        )
+        self.s3_bucket.put_object(Body=meta_file_content, Key=meta_key)
+
+        # Method Execution
+        MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_key, date_list_new
+        )
+
+        # Test after method execution
+        meta_df = self.meta_s3_bucket_conn.read_csv_to_df_ok(meta_key)
+        self.assertEqual(
+            expected_combined_date_list,
+            list(meta_df[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value]),
+        )
+
+    def test_update_meta_file_csv_meta_file_migration(self):
+        """
+        Tests the update_meta_file method when the meta key is a .parquet key
+        and only the .csv meta file of earlier versions exists,
+        confirms that its content is written to the .parquet key
+        """
+
+        # Expected results
+        date_list_old = ["2021-04-12", "2021-04-13"]
+        date_list_new = ["2021-04-16", "2021-04-17"]
+        expected_combined_date_list = date_list_old + date_list_new
+
+        # Test init
+        meta_key = "meta_file.parquet"
+        processed_date = datetime.today().strftime(
+            MetaProcessFormat.META_PROCESS_DATE_FORMAT.value
+        )
+        meta_file_content = (
+            f"{MetaProcessFormat.META_SOURCE_DATE_COLUMN.value},"
+            f"{MetaProcessFormat.META_PROCESS_COL.value}\n"
+            f"{date_list_old[0]},{processed_date}\n"
+            f"{date_list_old[1]},{processed_date}"
+        )
+        self.s3_bucket.put_object(Body=meta_file_content, Key="meta_file.csv")
+
+        # Method Execution
+        MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_key, date_list_new
+        )
+
+        # Test after method execution
+        meta_df = self.meta_s3_bucket_conn.read_parquet_to_df(meta_key)
+        self.assertEqual(
+            expected_combined_date_list,
+            list(
+                meta_df[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value].dt.strftime(
+                    MetaProcessFormat.META_DATE_FORMAT.value
+                )
+            ),
+        )
+
+    def test_update_meta_file_df_old(self):
+        """
+        Tests the update_meta_file method when the old meta file content
+        is passed in and confirms that the meta file is not read again
+        """
+
+        # Expected results
+        date_list_old = ["2021-04-12", "2021-04-13"]
+        date_list_new = ["2021-04-16", "2021-04-17"]
+        expected_combined_date_list = date_list_old + date_list_new
+        expected_log = "Old and new metafile exists"
+
+        # Test init
+        meta_key = "meta_file"
+        df_old = pd.DataFrame(
+            {
+                MetaProcessFormat.META_SOURCE_DATE_COLUMN.value: pd.to_datetime(
+                    date_list_old
+                ),
+                MetaProcessFormat.META_PROCESS_COL.value: datetime.today().strftime(
+                    MetaProcessFormat.META_PROCESS_DATE_FORMAT.value
+                ),
+            }
+        )
+
+        # Method Execution
+        self._log_handler.buffer.clear()
+        MetaProcess.update_meta_file(
+            self.meta_s3_bucket_conn, meta_key, date_list_new, df_old
+        )
+
+        # Log test after method execution, the meta file is not read
+        self.assertLogged(expected_log)
+        self.assertFalse(
+            any(
+                "Reading file" in record.getMessage()
+                for record in self._log_handler.buffer
+            )
+        )
+        meta_df = self.meta_s3_bucket_conn.read_parquet_to_df(meta_key)
+        self.assertEqual(
+            expected_combined_date_list,
+            list(
+                meta_df[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value].dt.strftime(
+                    MetaProcessFormat.META_DATE_FORMAT.value
+                )
+            ),
+        )
 
     def test_return_date_list_ok(self):
         """
@@ -280,14 +416,12 @@ class TestMetaProcess(unittest.TestCase):
         first_date_list = [self.dates[1], self.dates[4], self.dates[7]]
         # Method execution
         for count, first_date in enumerate(first_date_list):
-            min_date_return, date_list_return = MetaProcess.return_date_list(
+            min_date_return, date_list_return, _ = MetaProcess.return_date_list(
                 self.meta_s3_bucket_conn, first_date, meta_key
             )
             # Test after method execution
             self.assertEqual(set(date_list_exp[count]), set(date_list_return))
             self.assertEqual(min_date_exp[count], min_date_return)
-        # Cleanup after test
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_key}]})
 
     def test_return_date_list_empty_date_list(self):
         """
@@ -308,14 +442,41 @@ class TestMetaProcess(unittest.TestCase):
         self.s3_bucket.put_object(Body=meta_content, Key=meta_key)
         first_date = self.dates[0]
         # Method execution
-        min_date_return, date_list_return = MetaProcess.return_date_list(
+        min_date_return, date_list_return, _ = MetaProcess.return_date_list(
+            self.meta_s3_bucket_conn, first_date, meta_key
+        )
+        # Test after method execution
+        self.assertEqual(date_list_exp, date_list_return)
+        self.assertEqual(min_date_exp, min_date_return)
+
+    def test_return_date_list_parquet_meta_file(self):
+        """
+        Tests the return_date_list method
+        when the meta file is a parquet file with typed source dates
+        """
+        # Expected results
+        min_date_exp = "9999-12-01"
+        date_list_exp = []
+        # Test init
+        meta_key = "meta.parquet"
+        meta_content = BytesIO()
+        pd.DataFrame(
+            {
+                MetaProcessFormat.META_SOURCE_DATE_COLUMN.value: pd.to_datetime(
+                    [self.dates[0], self.dates[1]]
+                ),
+                MetaProcessFormat.META_PROCESS_COL.value: self.dates[0],
+            }
+        ).to_parquet(meta_content, index=False)
+        self.s3_bucket.put_object(Body=meta_content.getvalue(), Key=meta_key)
+        first_date = self.dates[0]
+        # Method execution
+        min_date_return, date_list_return, _ = MetaProcess.return_date_list(
             self.meta_s3_bucket_conn, first_date, meta_key
         )
         # Test after method execution
         self.assertEqual(date_list_exp, date_list_return)
         self.assertEqual(min_date_exp, min_date_return)
-        # Cleanup after test
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_key}]})
 
     def test_return_date_list_no_meta_file(self):
         """
@@ -336,7 +497,7 @@ class TestMetaProcess(unittest.TestCase):
         first_date = min_date_exp
         meta_key = "meta.csv"
         # Method execution
-        min_date_return, date_list_return = MetaProcess.return_date_list(
+        min_date_return, date_list_return, _ = MetaProcess.return_date_list(
             self.meta_s3_bucket_conn, first_date, meta_key
         )
         # Test after method execution
@@ -361,8 +522,6 @@ class TestMetaProcess(unittest.TestCase):
         # Method execution
         with self.assertRaises(KeyError):
             MetaProcess.return_date_list(self.meta_s3_bucket_conn, first_date, meta_key)
-        # Cleanup after test
-        self.s3_bucket.delete_objects(Delete={"Objects": [{"Key": meta_key}]})
 
 
 if __name__ == "__main__":
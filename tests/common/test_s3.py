@@ -3,47 +3,68 @@ Test S3BucketConnectorMethods
 """
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from unittest.mock import patch
 import boto3
-from io import StringIO, BytesIO
+from botocore.exceptions import ClientError
+from io import BytesIO
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from moto import mock_aws
 
-from xetra_code.common.s3 import S3BucketConnector
+from tests.log_capture import LogCaptureMixin
+from xetra_code.common.s3 import _TRANSFER_CONFIG, S3BucketConnector
 from xetra_code.common.custom_exceptions import WrongFormatException
 
-class TestS3BucketConnectorMethods(unittest.TestCase):
+
+class TestS3BucketConnectorMethods(LogCaptureMixin, unittest.TestCase):
     """
     Testing the S3BucketConnector Class
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
         Here we setup the environment and variables for the mock aws
+        once for all the tests of the class
         """
 
         # First: We initialize/start mocking the aws connection
-        self.mock_s3 = mock_aws()
-        self.mock_s3.start()
+        cls.mock_s3 = mock_aws()
+        cls.mock_s3.start()
 
         # Second: We define the class arguments that will go into the S3BucketConnector
         # Hence imitating the real S3BucketConnector; you can check the arguments in the S3BucketConnector class to confirm
 
-        self.s3_access_key = "AWS_ACCESS_KEY"
-        self.s3_secret_key = "AWS_SECRET_KEY"
-        self.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
-        self.s3_bucket_name = "test-bucket"
+        cls.s3_access_key = "AWS_ACCESS_KEY"
+        cls.s3_secret_key = "AWS_SECRET_KEY"
+        cls.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
+        cls.s3_bucket_name = "test-bucket"
 
         # Third: Initialize an actual s3 service and use the mocked bucket on the mock_aws service
 
-        self.s3 = boto3.resource(service_name="s3", endpoint_url=self.s3_endpoint_url)
+        cls.s3 = boto3.resource(service_name="s3", endpoint_url=cls.s3_endpoint_url)
 
-        self.s3.create_bucket(
-            Bucket=self.s3_bucket_name,
+        cls.s3.create_bucket(
+            Bucket=cls.s3_bucket_name,
             CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
         )
 
-        self.s3_bucket = self.s3.Bucket(self.s3_bucket_name)
+        cls.s3_bucket = cls.s3.Bucket(cls.s3_bucket_name)
+
+        # Capturing log records once for the whole class instead of per test
+        cls.start_log_capture()
+
+    @classmethod
+    def tearDownClass(cls):
+        # Stopping the mock s3 connection
+
+        cls.mock_s3.stop()
+        cls.stop_log_capture()
 
+    def setUp(self):
         # Creating a testing instance
         self.s3_bucket_conn = S3BucketConnector(
             self.s3_access_key,
@@ -51,12 +72,25 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
             self.s3_endpoint_url,
             self.s3_bucket_name,
         )
-        
+        # Keys written by a test, deleted with one request in tearDown
+        self._written_keys = []
 
     def tearDown(self):
-        # Stopping the mock s3 connection
+        # Cleanup after tests
+        if self._written_keys:
+            self.s3_bucket.delete_objects(
+                Delete={"Objects": [{"Key": key} for key in self._written_keys]}
+            )
 
-        self.mock_s3.stop()
+    def test_client_config(self):
+        """
+        This tests that the S3BucketConnector client is created with
+        the tuned connection pool, keepalive and retry configuration
+        """
+        client_config = self.s3_bucket_conn._client.meta.config
+        self.assertEqual(client_config.max_pool_connections, 32)
+        self.assertTrue(client_config.tcp_keepalive)
+        self.assertEqual(client_config.retries["mode"], "adaptive")
 
     def test_list_files_in_prefix_ok(self):
         """
@@ -72,6 +106,7 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         csv_content = """ col1, col2\nvalA, valB"""
         self.s3_bucket.put_object(Body=csv_content, Key=key1_exp)
         self.s3_bucket.put_object(Body=csv_content, Key=key2_exp)
+        self._written_keys.extend([key1_exp, key2_exp])
 
         # Method execution
         list_result = self.s3_bucket_conn.list_files_in_prefix(prefix_expected)
@@ -81,11 +116,6 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         self.assertIn(key1_exp, list_result)
         self.assertIn(key2_exp, list_result)
 
-        # Cleanup after tests
-        self.s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": key1_exp}, {"Key": key2_exp}]}
-        )
-
     def test_list_files_in_prefix_wrong_prefix(self):
         """
         This tests the list_files_in_prefix method in case of a wrong or non-existing prefix
@@ -97,6 +127,76 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         # Test after method execution
         self.assertTrue(not list_result)
 
+    def test_list_files_no_cache_by_default(self):
+        """
+        This tests that list_files_in_prefix lists the bucket on every call
+        by default, so files written by other connectors are listed right away
+        """
+        # Expected results
+        prefix_expected = "prefix/"
+        key_exp = f"{prefix_expected}test1.csv"
+
+        # Method execution
+        list_result1 = self.s3_bucket_conn.list_files_in_prefix(prefix_expected)
+        self.s3_bucket.put_object(Body="col1,col2\nvalA,valB", Key=key_exp)
+        self._written_keys.append(key_exp)
+        list_result2 = self.s3_bucket_conn.list_files_in_prefix(prefix_expected)
+
+        # Tests after method execution
+        self.assertEqual([], list_result1)
+        self.assertEqual([key_exp], list_result2)
+        self.assertFalse(self.s3_bucket_conn._list_cache)
+
+    def test_list_files_cache_hit(self):
+        """
+        This tests that a repeated list_files_in_prefix call with use_cache
+        and the same prefix is served from the cache without listing the bucket again
+        """
+        # Expected results
+        prefix_expected = "prefix/"
+        key_exp = f"{prefix_expected}test1.csv"
+
+        # Test init
+        self.s3_bucket.put_object(Body="col1,col2\nvalA,valB", Key=key_exp)
+        self._written_keys.append(key_exp)
+        client = self.s3_bucket_conn._client
+
+        # Method execution
+        with patch.object(client, "get_paginator", wraps=client.get_paginator) as mocked_paginator:
+            list_result1 = self.s3_bucket_conn.list_files_in_prefix(
+                prefix_expected, use_cache=True
+            )
+            list_result2 = self.s3_bucket_conn.list_files_in_prefix(
+                prefix_expected, use_cache=True
+            )
+
+        # Tests after method execution
+        self.assertEqual(mocked_paginator.call_count, 1)
+        self.assertEqual([key_exp], list_result1)
+        self.assertEqual(list_result1, list_result2)
+
+    def test_list_files_cache_concurrent_eviction(self):
+        """
+        This tests that listing more prefixes than LIST_CACHE_MAXSIZE
+        from many threads at once keeps the cache bounded without errors
+        """
+        # Test init
+        prefixes = [f"prefix{i}/" for i in range(64)]
+
+        # Method execution
+        with patch("xetra_code.common.s3.LIST_CACHE_MAXSIZE", 4):
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list_results = list(
+                    executor.map(
+                        partial(self.s3_bucket_conn.list_files_in_prefix, use_cache=True),
+                        prefixes,
+                    )
+                )
+
+        # Tests after method execution
+        self.assertEqual([[]] * len(prefixes), list_results)
+        self.assertLessEqual(len(self.s3_bucket_conn._list_cache), 4)
+
     def test_read_csv_to_df(self):
         """
         This test the read_csv_to_df method for
@@ -115,18 +215,16 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         # Test init
         csv_content = f"{col1},{col2}\n{val1_exp},{val2_exp}"
         self.s3_bucket.put_object(Body=csv_content, Key=key_exp)
+        self._written_keys.append(key_exp)
 
         # Method execution
-        with self.assertLogs() as mocked_logs:
-            """
-            This line is using Python's unittest framework's assertLogs context manager. 
-            The purpose is to capture any log messages that are generated 
-            during the execution of the code block within the with statement.
-            """
-            df_result = self.s3_bucket_conn.read_csv_to_df_ok(key=key_exp)
-            
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[0])
+        # The class level MemoryHandler captures the log records
+        # generated during the method execution
+        self._log_handler.buffer.clear()
+        df_result = self.s3_bucket_conn.read_csv_to_df_ok(key=key_exp)
+
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
         
         
         # Now lets confirm the records are actually present in the dataframe
@@ -136,12 +234,207 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         self.assertEqual(df_result.shape[1], 2)
         self.assertEqual(val1_exp, df_result[col1][0])
         self.assertEqual(val2_exp, df_result[col2][0])
-        
-        # Cleanup after tests
-        self.s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": key_exp}]}
+
+    def test_read_csv_to_df_usecols_dtype(self):
+        """
+        This tests the read_csv_to_df method when only some
+        columns with given dtypes should be parsed
+        """
+
+        # Expected results
+        key_exp = "test_usecols.csv"
+        expected_df = pd.DataFrame({"col2": pd.Series([1.0, 2.0], dtype="float32")})
+
+        # Test init
+        self.s3_bucket.put_object(Body="col1,col2\na,1\nb,2", Key=key_exp)
+        self._written_keys.append(key_exp)
+
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_to_df_ok(
+            key=key_exp, usecols=["col2"], dtype={"col2": "float32"}
+        )
+
+        # Tests after method execution
+        self.assertTrue(expected_df.equals(df_result))
+
+    def test_read_csv_to_df_no_values(self):
+        """
+        This tests the read_csv_to_df method for a .csv file
+        without values and confirms that it returns an empty Dataframe
+        """
+
+        # Expected results
+        key_exp = "test_empty.csv"
+        columns_exp = ["col1", "col2"]
+
+        # Test init
+        self.s3_bucket.put_object(Body="col1,col2\n,", Key=key_exp)
+        self._written_keys.append(key_exp)
+
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_to_df_ok(key=key_exp)
+
+        # Tests after method execution
+        self.assertTrue(df_result.empty)
+        self.assertEqual(columns_exp, list(df_result.columns))
+
+    def test_read_parquet_to_df(self):
+        """
+        This tests the read_parquet_to_df method for
+        reading 1 .parquet file with a column projection
+        """
+
+        # Expected results
+        key_exp = "test.parquet"
+        expected_df = pd.DataFrame({"col1": ["val1"]})
+        expected_log = f"Reading file {self.s3_endpoint_url}/{self.s3_bucket_name}/{key_exp}"
+
+        # Test init
+        output_buffer = BytesIO()
+        pd.DataFrame({"col1": ["val1"], "col2": ["val2"]}).to_parquet(
+            output_buffer, index=False
+        )
+        self.s3_bucket.put_object(Body=output_buffer.getvalue(), Key=key_exp)
+        self._written_keys.append(key_exp)
+
+        # Method execution
+        self._log_handler.buffer.clear()
+        df_result = self.s3_bucket_conn.read_parquet_to_df(key_exp, columns=["col1"])
+
+        # Tests after method execution
+        self.assertLogged(expected_log)
+        self.assertTrue(expected_df.equals(df_result))
+
+    def test_read_parquet_to_df_requests(self):
+        """
+        This tests that read_parquet_to_df reads a small .parquet file
+        with a single GetObject request and a file above the multipart
+        threshold with one more ranged GetObject request
+        """
+
+        # Expected results
+        key_exp = "test_requests.parquet"
+        expected_df = pd.DataFrame({"col1": ["val1"], "col2": ["val2"]})
+
+        # Test init
+        output_buffer = BytesIO()
+        expected_df.to_parquet(output_buffer, index=False)
+        self.s3_bucket.put_object(Body=output_buffer.getvalue(), Key=key_exp)
+        self._written_keys.append(key_exp)
+        operations = []
+
+        def record_operation(model, **kwargs):
+            operations.append(model.name)
+
+        events = self.s3_bucket_conn._client.meta.events
+        events.register("before-call.s3", record_operation)
+        # A small threshold splits the test file into a first and a second range
+        threshold_large = len(output_buffer.getvalue()) // 2
+
+        # Method execution
+        try:
+            df_result_small = self.s3_bucket_conn.read_parquet_to_df(key_exp)
+            operations_small = list(operations)
+            operations.clear()
+            with patch.object(_TRANSFER_CONFIG, "multipart_threshold", threshold_large):
+                df_result_large = self.s3_bucket_conn.read_parquet_to_df(key_exp)
+        finally:
+            events.unregister("before-call.s3", record_operation)
+
+        # Tests after method execution
+        self.assertEqual(["GetObject"], operations_small)
+        self.assertEqual(["GetObject", "GetObject"], operations)
+        self.assertTrue(expected_df.equals(df_result_small))
+        self.assertTrue(expected_df.equals(df_result_large))
+
+    def test_read_parquet_to_df_empty_object(self):
+        """
+        This tests that the ranged GET of read_parquet_to_df
+        does not fail with InvalidRange on an empty object
+        """
+        # Test init
+        key_exp = "test_empty.parquet"
+        self.s3_bucket.put_object(Body=b"", Key=key_exp)
+        self._written_keys.append(key_exp)
+
+        # Method execution and tests after method execution,
+        # the empty object reaches the parquet reader instead of failing on S3
+        with self.assertRaises(pa.ArrowInvalid):
+            self.s3_bucket_conn.read_parquet_to_df(key_exp)
+
+    def test_read_csv_batch(self):
+        """
+        This tests the read_csv_batch method for
+        reading 32 .csv files in parallel into one Dataframe
+        """
+
+        # Expected results
+        prefix_exp = "batch/"
+        keys_exp = [f"{prefix_exp}test{i:02d}.csv" for i in range(32)]
+        col1 = "col1"
+        col2 = "col2"
+
+        # Test init
+        for i, key in enumerate(keys_exp):
+            self.s3_bucket.put_object(Body=f"{col1},{col2}\n{i},val{i}", Key=key)
+        self._written_keys.extend(keys_exp)
+
+        # Method execution
+        self._log_handler.buffer.clear()
+        df_result = self.s3_bucket_conn.read_csv_batch(keys_exp)
+
+        # Log test after method execution, one log record per file
+        self.assertEqual(
+            sorted(
+                f"Reading file {self.s3_endpoint_url}/{self.s3_bucket_name}/{key}"
+                for key in keys_exp
+            ),
+            sorted(record.getMessage() for record in self._log_handler.buffer),
+        )
+        # Tests after method execution
+        self.assertEqual(df_result.shape, (32, 2))
+        self.assertEqual(list(range(32)), list(df_result[col1]))
+        self.assertEqual([f"val{i}" for i in range(32)], list(df_result[col2]))
+
+    def test_read_csv_batch_no_keys(self):
+        """
+        This tests the read_csv_batch method when there are no keys to be read
+        """
+        # Method execution
+        df_result = self.s3_bucket_conn.read_csv_batch([])
+        # Test after method execution
+        self.assertTrue(df_result.empty)
+
+    def test_read_dataset(self):
+        """
+        This tests the read_dataset method for reading 2 .parquet files
+        with a column projection and a row filter
+        """
+
+        # Expected results
+        prefix_exp = "dataset/"
+        key1_exp = f"{prefix_exp}test1.parquet"
+        key2_exp = f"{prefix_exp}test2.parquet"
+        expected_df = pd.DataFrame({"col1": [2, 3]})
+
+        # Test init
+        for key, test_data in [
+            (key1_exp, {"col1": [1, 2], "col2": ["a", "b"]}),
+            (key2_exp, {"col1": [3, 4], "col2": ["c", "d"]}),
+        ]:
+            output_buffer = BytesIO()
+            pd.DataFrame(data=test_data).to_parquet(output_buffer, index=False)
+            self.s3_bucket.put_object(Body=output_buffer.getvalue(), Key=key)
+        self._written_keys.extend([key1_exp, key2_exp])
+
+        # Method execution
+        df_result = self.s3_bucket_conn.read_dataset(
+            prefix_exp, columns=["col1"], filters=[("col2", "in", ["b", "c"])]
         )
-    
+
+        # Tests after method execution
+        self.assertTrue(expected_df.equals(df_result))
+
     def test_write_df_to_s3_empty(self):
         """
         This tests the write_df_to_s3 method by trying to add an empty dataframe
@@ -152,11 +445,11 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         expected_key = "emp_file"
         file_format = ".csv"
         # Method execution
-        with self.assertLogs() as mocked_logs:
-            df_result = self.s3_bucket_conn.write_df_to_s3(data_frame=empty_dataframe, key=expected_key, file_format=file_format)
+        self._log_handler.buffer.clear()
+        df_result = self.s3_bucket_conn.write_df_to_s3(data_frame=empty_dataframe, key=expected_key, file_format=file_format)
 
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[0])
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
         
         self.assertEqual(result_exp, df_result)
         
@@ -174,27 +467,75 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         csv_df = pd.DataFrame(data = test_data)
         
         # Method Execution
-        with self.assertLogs() as mocked_logs:
-            csv_result = self.s3_bucket_conn.write_df_to_s3(data_frame=csv_df, key=f"{key_exp}.{file_format}", file_format=file_format)
-            
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[0])
+        self._log_handler.buffer.clear()
+        csv_result = self.s3_bucket_conn.write_df_to_s3(data_frame=csv_df, key=f"{key_exp}.{file_format}", file_format=file_format)
+        self._written_keys.append(f"{key_exp}.{file_format}")
+
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
         
         # Testing the Method Execution
         self.assertEqual(return_exp, csv_result)
         
         # Testing that the dataframe written equals the original
-        written_df_object = self.s3_bucket.Object(key=f"{key_exp}.{file_format}").get().get("Body").read().decode("utf-8")
-        output_buffer = StringIO(written_df_object)
+        written_df_object = self.s3_bucket.Object(key=f"{key_exp}.{file_format}").get().get("Body").read()
+        output_buffer = BytesIO(written_df_object)
         written_df = pd.read_csv(output_buffer, delimiter = ',')
         
         self.assertTrue(csv_df.equals(written_df))
-        
-        # Cleanup after tests
-        self.s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": f"{key_exp}.{file_format}"}]}
+
+    def test_write_df_to_s3_csv_mixed_types(self):
+        """
+        This tests the write_df_to_s3 method by adding 1 csv file
+        with a column of mixed types
+        """
+        # Expected results
+        return_exp = True
+        key_exp = "testfile_mixed.csv"
+        file_format = "csv"
+        csv_df = pd.DataFrame(data={"col1": [1, "a"], "col2": [3, 4]})
+        csv_exp = "col1,col2\n1,3\na,4\n"
+
+        # Method Execution
+        csv_result = self.s3_bucket_conn.write_df_to_s3(data_frame=csv_df, key=key_exp, file_format=file_format)
+        self._written_keys.append(key_exp)
+
+        # Testing the Method Execution
+        self.assertEqual(return_exp, csv_result)
+        written_csv = self.s3_bucket.Object(key=key_exp).get().get("Body").read().decode("utf-8")
+        self.assertEqual(csv_exp, written_csv)
+
+    def test_write_df_to_s3_csv_str_float_datetime(self):
+        """
+        This tests the write_df_to_s3 method by adding 1 csv file with string,
+        float and datetime columns and confirms the written text and the round trip
+        """
+        # Expected results
+        key_exp = "testfile_types.csv"
+        file_format = "csv"
+        csv_df = pd.DataFrame(
+            data={
+                "col1": ["a", "b,c"],
+                "col2": [20.0, 1.5],
+                "col3": pd.to_datetime(["2021-01-01 00:00:00", "2021-01-02 10:30:00"]),
+            }
         )
-    
+        csv_exp = (
+            "col1,col2,col3\n"
+            "a,20.0,2021-01-01 00:00:00\n"
+            '"b,c",1.5,2021-01-02 10:30:00\n'
+        )
+
+        # Method Execution
+        self.s3_bucket_conn.write_df_to_s3(data_frame=csv_df, key=key_exp, file_format=file_format)
+        self._written_keys.append(key_exp)
+
+        # Testing the written text and that it reads back with the same types
+        written_csv = self.s3_bucket.Object(key=key_exp).get().get("Body").read().decode("utf-8")
+        self.assertEqual(csv_exp, written_csv)
+        written_df = pd.read_csv(BytesIO(written_csv.encode("utf-8")), parse_dates=["col3"])
+        self.assertTrue(csv_df.equals(written_df))
+
     def test_write_df_to_s3_parquet(self):
         """
         This tests the write_df_to_s3 method by adding 1 csv file
@@ -209,11 +550,12 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         parquet_df = pd.DataFrame(data = test_data)
         
         # Method Execution
-        with self.assertLogs() as mocked_logs:
-            parquet_result = self.s3_bucket_conn.write_df_to_s3(data_frame=parquet_df, key=f"{key_exp}.{file_format}", file_format=file_format)
-            
-            # Log test after method execution and confirm expected log is present
-            self.assertIn(expected_log, mocked_logs.output[0])
+        self._log_handler.buffer.clear()
+        parquet_result = self.s3_bucket_conn.write_df_to_s3(data_frame=parquet_df, key=f"{key_exp}.{file_format}", file_format=file_format)
+        self._written_keys.append(f"{key_exp}.{file_format}")
+
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
         
         # Testing the Method Execution
         self.assertEqual(return_exp, parquet_result)
@@ -224,12 +566,73 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         written_df = pd.read_parquet(output_buffer)
         
         self.assertTrue(parquet_df.equals(written_df))
-        
-        # Cleanup after tests
-        self.s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": f"{key_exp}.{file_format}"}]}
+        # Both rows fit in one row group
+        written_metadata = pq.read_metadata(output_buffer)
+        self.assertEqual(written_metadata.num_row_groups, 1)
+        self.assertEqual(written_metadata.row_group(0).num_rows, 2)
+        self.assertEqual(written_metadata.row_group(0).column(0).compression, "ZSTD")
+
+    def test_write_df_to_s3_requests(self):
+        """
+        This tests that write_df_to_s3 writes a small file with a single
+        PutObject request and a file above the multipart threshold
+        with a multipart upload
+        """
+        # Expected results
+        key_small = "test_small.csv"
+        key_large = "test_large.csv"
+        df_exp = pd.DataFrame({"col1": ["val1"], "col2": ["val2"]})
+
+        # Test init
+        operations = []
+
+        def record_operation(model, **kwargs):
+            operations.append(model.name)
+
+        events = self.s3_bucket_conn._client.meta.events
+        events.register("before-call.s3", record_operation)
+
+        # Method execution
+        try:
+            self.s3_bucket_conn.write_df_to_s3(df_exp, key_small, "csv")
+            operations_small = list(operations)
+            operations.clear()
+            with patch.object(_TRANSFER_CONFIG, "multipart_threshold", 1):
+                self.s3_bucket_conn.write_df_to_s3(df_exp, key_large, "csv")
+        finally:
+            events.unregister("before-call.s3", record_operation)
+        self._written_keys.extend([key_small, key_large])
+
+        # Tests after method execution
+        self.assertEqual(["PutObject"], operations_small)
+        self.assertEqual(
+            ["CreateMultipartUpload", "UploadPart", "CompleteMultipartUpload"],
+            operations,
         )
-    
+        for key in (key_small, key_large):
+            self.assertTrue(
+                df_exp.equals(self.s3_bucket_conn.read_csv_to_df_ok(key))
+            )
+
+    def test_write_df_to_s3_client_error(self):
+        """
+        This tests that write_df_to_s3 raises the ClientError of S3
+        when the file can not be written
+        """
+        # Test init
+        s3_bucket_conn = S3BucketConnector(
+            self.s3_access_key,
+            self.s3_secret_key,
+            self.s3_endpoint_url,
+            "no-such-bucket",
+        )
+
+        # Method execution and tests after method execution
+        with self.assertRaises(ClientError):
+            s3_bucket_conn.write_df_to_s3(
+                pd.DataFrame({"col1": [1]}), "test.csv", "csv"
+            )
+
     def test_write_df_to_s3_wrong_format(self):
         """
         This tests the write_df_to_s3 method by providing the wrong format
@@ -243,12 +646,12 @@ class TestS3BucketConnectorMethods(unittest.TestCase):
         exception_exp = WrongFormatException
         
         # Method Execution
-        with self.assertLogs() as mocked_logs:
-            with self.assertRaises(exception_exp):
-                self.s3_bucket_conn.write_df_to_s3(data_frame=wrong_dataframe, key=f"{key_exp}.{file_format}", file_format=file_format)
+        self._log_handler.buffer.clear()
+        with self.assertRaises(exception_exp):
+            self.s3_bucket_conn.write_df_to_s3(data_frame=wrong_dataframe, key=f"{key_exp}.{file_format}", file_format=file_format)
 
-                # Log test after method execution and confirm expected log is present
-                self.assertIn(expected_log, mocked_logs.output[0])
+        # Log test after method execution and confirm expected log is present
+        self.assertLogged(expected_log)
 
 if __name__ == "__main__":
     unittest.main()
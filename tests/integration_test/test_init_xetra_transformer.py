@@ -37,7 +37,7 @@ class IntegrationTestXetraETL(unittest.TestCase):
         self.s3_endpoint_url = "https://s3.us-east-1.amazonaws.com"
         self.s3_bucket_name_src = "xetra-integration-test-source"
         self.s3_bucket_name_trg = "xetra-integration-test-target"
-        self.meta_key = "meta_file.csv"
+        self.meta_key = "meta_file.parquet"
 
         # Third: Initialize an actual s3 service and use the mocked bucket on the mock_aws service
 
@@ -246,51 +246,20 @@ class IntegrationTestXetraETL(unittest.TestCase):
         # print("Source Dataframe:")
         # print(self.df_src.head(10))
         # Adding files to s3 and ensuring the prefix are aligned for test
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[0:0],
+        src_rows = [self.df_src.iloc[[i]] for i in range(len(self.df_src))]
+        src_keys = [
             f"{self.dates[5]}/{self.dates[5]}_TEST_FILE12.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[1:1],
             f"{self.dates[4]}/{self.dates[4]}_TEST_FILE15.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[2:2],
             f"{self.dates[3]}/{self.dates[3]}_TEST_FILE13.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[3:3],
             f"{self.dates[3]}/{self.dates[3]}_TEST_FILE14.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[4:4],
             f"{self.dates[2]}/{self.dates[2]}_TEST_FILE07.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[5:5],
             f"{self.dates[2]}/{self.dates[2]}_TEST_FILE08.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[6:6],
             f"{self.dates[1]}/{self.dates[1]}_TEST_FILE07.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[7:7],
             f"{self.dates[1]}/{self.dates[1]}_TEST_FILE08.csv",
-            "csv",
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[8:8],
             f"{self.dates[1]}/{self.dates[1]}_TEST_FILE09.csv",
-            "csv",
-        )
+        ]
+        for src_row, src_key in zip(src_rows, src_keys):
+            self.s3_bucket_src.write_df_to_s3(src_row, src_key, "csv")
 
         # For the target table
         columns_report = [
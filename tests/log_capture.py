@@ -0,0 +1,46 @@
+"""
+Shared log capturing for the test classes
+"""
+
+import logging
+import logging.handlers
+
+
+class LogCaptureMixin:
+    """
+    Captures the INFO log records of the root logger in a MemoryHandler
+    once for a whole test class, the records are read from cls._log_handler.buffer
+    """
+
+    @classmethod
+    def start_log_capture(cls):
+        """
+        Adds the MemoryHandler to the root logger, called in setUpClass
+        """
+        cls._log_handler = logging.handlers.MemoryHandler(10_000)
+        cls._log_handler.setLevel(logging.INFO)
+        cls._root_log_level = logging.getLogger().level
+        logging.getLogger().addHandler(cls._log_handler)
+        logging.getLogger().setLevel(logging.INFO)
+
+    @classmethod
+    def stop_log_capture(cls):
+        """
+        Removes the MemoryHandler from the root logger, called in tearDownClass
+        """
+        logging.getLogger().removeHandler(cls._log_handler)
+        logging.getLogger().setLevel(cls._root_log_level)
+        cls._log_handler.close()
+
+    def assertLogged(self, expected_log: str):
+        """
+        Asserts that one of the captured log records contains expected_log,
+        independent of the records logged before or after it
+        """
+        self.assertTrue(
+            any(
+                expected_log in record.getMessage()
+                for record in self._log_handler.buffer
+            ),
+            f"{expected_log!r} was not logged",
+        )
@@ -0,0 +1,189 @@
+"""
+Test the configuration and logging helpers of run.py
+"""
+
+import os
+import pickle
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+
+import run
+
+
+class TestLoadConfig(unittest.TestCase):
+    """
+    Testing the load_config function
+    """
+
+    def setUp(self):
+        # Every test writes its config file and cache into a fresh directory
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self._tmp_dir.name) / "config.yml"
+        self.cache_path = Path(f"{self.config_path}.pkl")
+        self.config_path.write_text("source:\n  src_first_extract_date: '2021-04-01'\n")
+        self.config_exp = {"source": {"src_first_extract_date": "2021-04-01"}}
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _load(self):
+        with open(self.config_path, "rb") as config_file:
+            return run.load_config(config_file)
+
+    def test_load_config_cache_hit(self):
+        """
+        Tests that the second load is served from the pickle cache
+        without parsing the YAML file again
+        """
+        # Method execution
+        config_result1 = self._load()
+        with patch.object(run.yaml, "load", wraps=yaml.load) as mocked_load:
+            config_result2 = self._load()
+        # Tests after method execution
+        self.assertTrue(self.cache_path.is_file())
+        mocked_load.assert_not_called()
+        self.assertEqual(self.config_exp, config_result1)
+        self.assertEqual(self.config_exp, config_result2)
+
+    def test_load_config_mtime_changed(self):
+        """
+        Tests that a changed YAML file is parsed again
+        instead of using the cached configuration
+        """
+        # Test init
+        self._load()
+        self.config_path.write_text("source:\n  src_first_extract_date: '2022-01-01'\n")
+        mtime = os.stat(self.config_path).st_mtime_ns + 1_000_000_000
+        os.utime(self.config_path, ns=(mtime, mtime))
+        # Method execution
+        config_result = self._load()
+        # Tests after method execution
+        self.assertEqual(
+            {"source": {"src_first_extract_date": "2022-01-01"}}, config_result
+        )
+        cached_mtime, cached_config = pickle.loads(self.cache_path.read_bytes())
+        self.assertEqual(mtime, cached_mtime)
+        self.assertEqual(config_result, cached_config)
+
+    def test_load_config_corrupt_cache(self):
+        """
+        Tests that a corrupt pickle file is ignored and rewritten
+        """
+        # Test init
+        self.cache_path.write_bytes(b"not a pickle")
+        self.cache_path.chmod(0o600)
+        # Method execution
+        config_result = self._load()
+        # Tests after method execution
+        self.assertEqual(self.config_exp, config_result)
+        self.assertEqual(self.config_exp, pickle.loads(self.cache_path.read_bytes())[1])
+
+    def test_load_config_cache_not_tuple(self):
+        """
+        Tests that a valid pickle which is not an (mtime, config) tuple is ignored
+        """
+        # Test init
+        self.cache_path.write_bytes(pickle.dumps(42))
+        self.cache_path.chmod(0o600)
+        # Method execution
+        config_result = self._load()
+        # Tests after method execution
+        self.assertEqual(self.config_exp, config_result)
+
+    def test_load_config_cache_mode(self):
+        """
+        Tests that the cache holding the credentials is only accessible by its owner,
+        also when the YAML file and an existing cache are readable by everybody
+        """
+        # Test init
+        self.config_path.chmod(0o644)
+        self.cache_path.write_bytes(b"")
+        self.cache_path.chmod(0o644)
+        # Method execution
+        self._load()
+        # Tests after method execution
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.cache_path).st_mode))
+
+    def test_load_config_cache_accessible_by_others(self):
+        """
+        Tests that a cache which other users can write is not unpickled
+        """
+        # Test init
+        config_mtime = os.stat(self.config_path).st_mtime_ns
+        self.cache_path.write_bytes(pickle.dumps((config_mtime, {"planted": True})))
+        self.cache_path.chmod(0o666)
+        # Method execution
+        config_result = self._load()
+        # Tests after method execution
+        self.assertEqual(self.config_exp, config_result)
+
+    def test_load_config_unreadable_cache(self):
+        """
+        Tests that a cache path which can not be read or written is ignored
+        """
+        # Test init
+        self.cache_path.mkdir()
+        # Method execution
+        config_result = self._load()
+        # Tests after method execution
+        self.assertEqual(self.config_exp, config_result)
+
+    def test_load_config_not_regular_file(self):
+        """
+        Tests that input which is not a regular file, e.g stdin,
+        is parsed without writing a cache file
+        """
+        # Test init
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, "wb") as pipe_writer:
+            pipe_writer.write(self.config_path.read_bytes())
+        cwd = os.getcwd()
+        os.chdir(self._tmp_dir.name)
+        try:
+            # Method execution
+            with os.fdopen(read_fd, "rb") as config_file:
+                config_result = run.load_config(config_file)
+        finally:
+            os.chdir(cwd)
+        # Tests after method execution
+        self.assertEqual(self.config_exp, config_result)
+        self.assertEqual(["config.yml"], os.listdir(self._tmp_dir.name))
+
+
+class TestConfigureLogging(unittest.TestCase):
+    """
+    Testing the configure_logging function
+    """
+
+    def setUp(self):
+        # No logging configuration is applied at the start of a test
+        run._LOG_CONFIG_HASH = None
+
+    def tearDown(self):
+        run._LOG_CONFIG_HASH = None
+
+    def test_configure_logging_unchanged(self):
+        """
+        Tests that an unchanged logging configuration is only applied once
+        and a changed one is applied again
+        """
+        # Test init
+        log_config = {"version": 1, "root": {"level": "INFO"}}
+        # Method execution
+        with patch.object(run.logging.config, "dictConfig") as mocked_dict_config:
+            run.configure_logging(log_config)
+            run.configure_logging(dict(log_config))
+            call_count_unchanged = mocked_dict_config.call_count
+            run.configure_logging({"version": 1, "root": {"level": "DEBUG"}})
+        # Tests after method execution
+        self.assertEqual(1, call_count_unchanged)
+        self.assertEqual(2, mocked_dict_config.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 from moto import mock_aws
 import boto3
+import numpy as np
 import pandas as pd
 from io import StringIO, BytesIO
 from xetra_code.transformers.xetra_transformers import (
@@ -18,54 +20,56 @@ class TestXetraETL(unittest.TestCase):
     Testing the XetraETL Class
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Here we setup the environment and variables for the mock aws
+        Here we setup the environment, variables and source files for the mock aws
+        once for all the tests of the class
         """
         # First: We initialize/start mocking the aws connection
-        self.mock_s3 = mock_aws()
-        self.mock_s3.start()
+        cls.mock_s3 = mock_aws()
+        cls.mock_s3.start()
 
         # Second: We define the class arguments that will go into the S3BucketConnector
         # Hence imitating the real S3BucketConnector; you can check the arguments in the S3BucketConnector class to confirm
 
-        self.s3_access_key = "AWS_ACCESS_KEY"
-        self.s3_secret_key = "AWS_SECRET_KEY"
-        self.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
-        self.s3_bucket_name_src = "src-bucket"
-        self.s3_bucket_name_trg = "trg-bucket"
-        self.meta_key = "meta_key"
+        cls.s3_access_key = "AWS_ACCESS_KEY"
+        cls.s3_secret_key = "AWS_SECRET_KEY"
+        cls.s3_endpoint_url = "https://s3.eu-central-1.amazonaws.com"
+        cls.s3_bucket_name_src = "src-bucket"
+        cls.s3_bucket_name_trg = "trg-bucket"
+        cls.meta_key = "meta_key"
 
         # Third: Initialize an actual s3 service and use the mocked bucket on the mock_aws service
 
-        self.s3 = boto3.resource(service_name="s3", endpoint_url=self.s3_endpoint_url)
+        cls.s3 = boto3.resource(service_name="s3", endpoint_url=cls.s3_endpoint_url)
 
-        self.s3.create_bucket(
-            Bucket=self.s3_bucket_name_src,
+        cls.s3.create_bucket(
+            Bucket=cls.s3_bucket_name_src,
             CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
         )
 
-        self.s3.create_bucket(
-            Bucket=self.s3_bucket_name_trg,
+        cls.s3.create_bucket(
+            Bucket=cls.s3_bucket_name_trg,
             CreateBucketConfiguration={"LocationConstraint": "eu-central-1"},
         )
 
-        self.src_s3_bucket = self.s3.Bucket(self.s3_bucket_name_src)
-        self.trg_s3_bucket = self.s3.Bucket(self.s3_bucket_name_trg)
+        cls.src_s3_bucket = cls.s3.Bucket(cls.s3_bucket_name_src)
+        cls.trg_s3_bucket = cls.s3.Bucket(cls.s3_bucket_name_trg)
 
         # Creating a testing instance for both src & trg bucket
-        self.s3_bucket_src = S3BucketConnector(
-            self.s3_access_key,
-            self.s3_secret_key,
-            self.s3_endpoint_url,
-            self.s3_bucket_name_src,
+        cls.s3_bucket_src = S3BucketConnector(
+            cls.s3_access_key,
+            cls.s3_secret_key,
+            cls.s3_endpoint_url,
+            cls.s3_bucket_name_src,
         )
 
-        self.s3_bucket_trg = S3BucketConnector(
-            self.s3_access_key,
-            self.s3_secret_key,
-            self.s3_endpoint_url,
-            self.s3_bucket_name_trg,
+        cls.s3_bucket_trg = S3BucketConnector(
+            cls.s3_access_key,
+            cls.s3_secret_key,
+            cls.s3_endpoint_url,
+            cls.s3_bucket_name_trg,
         )
 
         # Creating source and target configuration
@@ -103,175 +107,204 @@ class TestXetraETL(unittest.TestCase):
             "trg_key_date_format": "%Y%m%d_%H%M%S",
             "trg_format": "parquet",
         }
-        self.source_config = XetraSourceConfig(**conf_dict_src)
-        self.target_config = XetraTargetConfig(**conf_dict_trg)
-        # Creating source files on mocked s3
-        columns_src = [
-            "ISIN",
-            "Mnemonic",
-            "Date",
-            "Time",
-            "StartPrice",
-            "EndPrice",
-            "MinPrice",
-            "MaxPrice",
-            "TradedVolume",
+        cls.source_config = XetraSourceConfig(**conf_dict_src)
+        cls.target_config = XetraTargetConfig(**conf_dict_trg)
+        # Creating Source DataFrame from typed columns, one contiguous array per column
+        cls.df_src = pd.DataFrame(
+            {
+                "ISIN": np.full(9, "AT0000A0E9W5", dtype=object),
+                "Mnemonic": np.full(9, "SANT", dtype=object),
+                "Date": np.array(
+                    [
+                        "2021-04-15",
+                        "2021-04-16",
+                        "2021-04-17",
+                        "2021-04-17",
+                        "2021-04-18",
+                        "2021-04-18",
+                        "2021-04-19",
+                        "2021-04-19",
+                        "2021-04-19",
+                    ],
+                    dtype=object,
+                ),
+                "Time": np.array(
+                    [
+                        "12:00",
+                        "15:00",
+                        "13:00",
+                        "14:00",
+                        "07:00",
+                        "08:00",
+                        "07:00",
+                        "08:00",
+                        "09:00",
+                    ],
+                    dtype=object,
+                ),
+                "StartPrice": np.array(
+                    [
+                        20.19,
+                        18.27,
+                        20.21,
+                        18.27,
+                        20.58,
+                        19.27,
+                        23.58,
+                        23.58,
+                        24.22,
+                    ],
+                    dtype=np.float64,
+                ),
+                "EndPrice": np.array(
+                    [
+                        18.45,
+                        21.19,
+                        18.27,
+                        21.19,
+                        19.27,
+                        21.14,
+                        23.58,
+                        24.22,
+                        22.21,
+                    ],
+                    dtype=np.float64,
+                ),
+                "MinPrice": np.array(
+                    [
+                        18.2,
+                        18.27,
+                        18.21,
+                        18.27,
+                        18.89,
+                        19.27,
+                        23.58,
+                        23.31,
+                        22.21,
+                    ],
+                    dtype=np.float64,
+                ),
+                "MaxPrice": np.array(
+                    [
+                        20.33,
+                        21.34,
+                        20.42,
+                        21.34,
+                        20.58,
+                        21.14,
+                        23.58,
+                        24.34,
+                        25.01,
+                    ],
+                    dtype=np.float64,
+                ),
+                "TradedVolume": np.array(
+                    [
+                        877,
+                        987,
+                        633,
+                        455,
+                        9066,
+                        1220,
+                        1035,
+                        1028,
+                        1523,
+                    ],
+                    dtype=np.int64,
+                ),
+            }
+        )
+
+        # Adding files to s3 and ensuring the prefix are aligned for test
+        src_keys = [
+            "2021-04-15/2021-04-15_TEST_FILE12.csv",
+            "2021-04-16/2021-04-16_TEST_FILE15.csv",
+            "2021-04-17/2021-04-17_TEST_FILE13.csv",
+            "2021-04-17/2021-04-17_TEST_FILE14.csv",
+            "2021-04-18/2021-04-18_TEST_FILE07.csv",
+            "2021-04-18/2021-04-18_TEST_FILE08.csv",
+            "2021-04-19/2021-04-19_TEST_FILE07.csv",
+            "2021-04-19/2021-04-19_TEST_FILE08.csv",
+            "2021-04-19/2021-04-19_TEST_FILE09.csv",
         ]
-        data = [
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-15",
-                "12:00",
-                20.19,
-                18.45,
-                18.20,
-                20.33,
-                877,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-16",
-                "15:00",
-                18.27,
-                21.19,
-                18.27,
-                21.34,
-                987,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-17",
-                "13:00",
-                20.21,
-                18.27,
-                18.21,
-                20.42,
-                633,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-17",
-                "14:00",
-                18.27,
-                21.19,
-                18.27,
-                21.34,
-                455,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-18",
-                "07:00",
-                20.58,
-                19.27,
-                18.89,
-                20.58,
-                9066,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-18",
-                "08:00",
-                19.27,
-                21.14,
-                19.27,
-                21.14,
-                1220,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-19",
-                "07:00",
-                23.58,
-                23.58,
-                23.58,
-                23.58,
-                1035,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-19",
-                "08:00",
-                23.58,
-                24.22,
-                23.31,
-                24.34,
-                1028,
-            ],
-            [
-                "AT0000A0E9W5",
-                "SANT",
-                "2021-04-19",
-                "09:00",
-                24.22,
-                22.21,
-                22.21,
-                25.01,
-                1523,
-            ],
+        # Serializing every source row to csv once, one file per row
+        cls._csv_rows = [
+            cls.df_src.iloc[[i]].to_csv(index=False).encode()
+            for i in range(len(cls.df_src))
         ]
-        # Creating Source DataFrame
-        self.df_src = pd.DataFrame(data, columns=columns_src)
+        # Uploading the raw bytes in parallel so the PUTs to the mocked s3 overlap
+        with ThreadPoolExecutor(max_workers=len(src_keys)) as executor:
+            list(
+                executor.map(
+                    lambda upload: cls.s3.meta.client.put_object(
+                        Bucket=cls.s3_bucket_name_src, Key=upload[0], Body=upload[1]
+                    ),
+                    zip(src_keys, cls._csv_rows),
+                )
+            )
 
-        # Adding files to s3 and ensuring the prefix are aligned for test
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[0:0], "2021-04-15/2021-04-15_TEST_FILE12.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[1:1], "2021-04-16/2021-04-16_TEST_FILE15.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[2:2], "2021-04-17/2021-04-17_TEST_FILE13.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[3:3], "2021-04-17/2021-04-17_TEST_FILE14.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[4:4], "2021-04-18/2021-04-18_TEST_FILE07.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[5:5], "2021-04-18/2021-04-18_TEST_FILE08.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[6:6], "2021-04-19/2021-04-19_TEST_FILE07.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[7:7], "2021-04-19/2021-04-19_TEST_FILE08.csv", "csv"
-        )
-        self.s3_bucket_src.write_df_to_s3(
-            self.df_src.loc[8:8], "2021-04-19/2021-04-19_TEST_FILE09.csv", "csv"
+        # For the target table
+        cls.df_report = pd.DataFrame(
+            {
+                "ISIN": np.array(
+                    [
+                        "AT0000A0E9W5",
+                        "AT0000A0E9W5",
+                        "AT0000A0E9W5",
+                    ],
+                    dtype=object,
+                ),
+                "Date": np.array(
+                    [
+                        "2021-04-17",
+                        "2021-04-18",
+                        "2021-04-19",
+                    ],
+                    dtype=object,
+                ),
+                "opening_price_eur": np.array([20.21, 20.58, 23.58], dtype=np.float64),
+                "closing_price_eur": np.array([18.27, 19.27, 24.22], dtype=np.float64),
+                "minimum_price_eur": np.array([18.21, 18.89, 22.21], dtype=np.float64),
+                "maximum_price_eur": np.array([21.34, 21.14, 25.01], dtype=np.float64),
+                "daily_traded_volume": np.array([1088, 10286, 3586], dtype=np.int64),
+                "change_prev_closing_%": np.array([0.0, 5.47, 25.69], dtype=np.float64),
+            }
         )
 
-        # For the target table
-        columns_report = [
-            "ISIN",
-            "Date",
-            "opening_price_eur",
-            "closing_price_eur",
-            "minimum_price_eur",
-            "maximum_price_eur",
-            "daily_traded_volume",
-            "change_prev_closing_%",
-        ]
-        data_report = [
-            ["AT0000A0E9W5", "2021-04-17", 20.21, 18.27, 18.21, 21.34, 1088, 0.00],
-            ["AT0000A0E9W5", "2021-04-18", 20.58, 19.27, 18.89, 21.14, 10286, 5.47],
-            ["AT0000A0E9W5", "2021-04-19", 23.58, 24.22, 22.21, 25.01, 3586, 25.69],
-        ]
-        self.df_report = pd.DataFrame(data_report, columns=columns_report)
+    @classmethod
+    def tearDownClass(cls):
+        # Stopping the mock s3 connection
+
+        cls.mock_s3.stop()
 
     def tearDown(self):
-        # Stopping the mock s3 connection
+        # Resetting the target bucket written by the load tests
+        self.trg_s3_bucket.objects.all().delete()
+
+    def test_init_meta_file_on_target_bucket(self):
+        """
+        This method tests that the meta file is read from the target bucket,
+        where load_to_s3 writes it
+        """
+
+        # Method execution
+        with patch.object(
+            MetaProcess,
+            "return_date_list",
+            return_value=["2021-04-17", ["2021-04-17"], pd.DataFrame()],
+        ) as mocked_return_date_list:
+            XetraETL(
+                self.s3_bucket_src,
+                self.s3_bucket_trg,
+                self.meta_key,
+                self.source_config,
+                self.target_config,
+            )
 
-        self.mock_s3.stop()
+        # Test after method execution
+        mocked_return_date_list.assert_called_once_with(
+            self.s3_bucket_trg, self.source_config.src_first_extract_date, self.meta_key
+        )
 
     def test_extract_ok(self):
         """
@@ -294,7 +327,43 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
+        ):
+            xetra_etl = XetraETL(
+                self.s3_bucket_src,
+                self.s3_bucket_trg,
+                self.meta_key,
+                self.source_config,
+                self.target_config,
+            )
+            df_result = xetra_etl.extract()
+
+        # Test after method execution
+        self.assertTrue(expected_df.equals(df_result))
+
+    def test_extract_parquet(self):
+        """
+        This method tests the extract method
+        when the source files are parquet files
+        """
+
+        # Expected results
+        expected_df = self.df_src
+        extract_date = "2021-05-01"
+        extract_date_list = [extract_date]
+        src_key = f"{extract_date}/{extract_date}_BINS_XETR01.parquet"
+
+        # Test init
+        # The extra column is not a source column and should not be read
+        output_buffer = BytesIO()
+        self.df_src.assign(Extra=1).to_parquet(output_buffer, index=False)
+        self.src_s3_bucket.put_object(Body=output_buffer.getvalue(), Key=src_key)
+
+        # Method execution
+        with patch.object(
+            MetaProcess,
+            "return_date_list",
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -305,6 +374,9 @@ class TestXetraETL(unittest.TestCase):
             )
             df_result = xetra_etl.extract()
 
+        # Cleaning up the parquet source file
+        self.src_s3_bucket.Object(src_key).delete()
+
         # Test after method execution
         self.assertTrue(expected_df.equals(df_result))
 
@@ -320,7 +392,7 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -352,7 +424,7 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -376,6 +448,91 @@ class TestXetraETL(unittest.TestCase):
         # Test after method execution
         self.assertTrue(df_exp.equals(df_result))
 
+    def test_transform_report1_two_isins(self):
+        """
+        Tests the transform_report1 method with the rows of two ISINs
+        interleaved and out of time order, confirms that the opening and
+        closing prices follow the trading times and that the first day
+        of every ISIN has no change to a previous closing price
+        """
+        # Expected results
+        df_exp = pd.DataFrame(
+            {
+                "ISIN": np.array(
+                    ["AT0000A0E9W5"] * 2 + ["DE000A0D9PT0"] * 2, dtype=object
+                ),
+                "Date": np.array(
+                    ["2021-04-16", "2021-04-17", "2021-04-16", "2021-04-17"],
+                    dtype=object,
+                ),
+                "opening_price_eur": np.array(
+                    [10.0, 12.0, 50.0, 44.0], dtype=np.float64
+                ),
+                "closing_price_eur": np.array(
+                    [11.0, 13.2, 55.0, 60.5], dtype=np.float64
+                ),
+                "minimum_price_eur": np.array(
+                    [9.5, 11.5, 49.0, 43.0], dtype=np.float64
+                ),
+                "maximum_price_eur": np.array(
+                    [11.2, 13.4, 56.0, 61.0], dtype=np.float64
+                ),
+                "daily_traded_volume": np.array([300, 700, 30, 70], dtype=np.int64),
+                "change_prev_closing_%": np.array(
+                    [np.nan, 20.0, np.nan, 10.0], dtype=np.float64
+                ),
+            }
+        )
+        # Test init
+        extract_date = "2021-04-16"
+        extract_date_list = ["2021-04-15", "2021-04-16", "2021-04-17"]
+        df_input = pd.DataFrame(
+            {
+                "ISIN": np.array(["DE000A0D9PT0", "AT0000A0E9W5"] * 4, dtype=object),
+                "Mnemonic": np.array(["SIE", "SANT"] * 4, dtype=object),
+                "Date": np.array(["2021-04-17"] * 4 + ["2021-04-16"] * 4, dtype=object),
+                "Time": np.array(
+                    ["09:00", "09:00", "08:00", "08:00"] * 2, dtype=object
+                ),
+                "StartPrice": np.array(
+                    [60.5, 13.2, 44.0, 12.0, 55.0, 11.0, 50.0, 10.0],
+                    dtype=np.float64,
+                ),
+                "EndPrice": np.array(
+                    [60.0, 13.0, 45.0, 12.2, 55.5, 11.1, 51.0, 10.2],
+                    dtype=np.float64,
+                ),
+                "MinPrice": np.array(
+                    [60.0, 13.0, 43.0, 11.5, 54.0, 10.8, 49.0, 9.5],
+                    dtype=np.float64,
+                ),
+                "MaxPrice": np.array(
+                    [61.0, 13.4, 45.0, 12.5, 56.0, 11.2, 51.0, 10.5],
+                    dtype=np.float64,
+                ),
+                "TradedVolume": np.array(
+                    [40, 400, 30, 300, 20, 200, 10, 100], dtype=np.int64
+                ),
+            }
+        )
+        # Method execution
+        with patch.object(
+            MetaProcess,
+            "return_date_list",
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
+        ):
+            xetra_etl = XetraETL(
+                self.s3_bucket_src,
+                self.s3_bucket_trg,
+                self.meta_key,
+                self.source_config,
+                self.target_config,
+            )
+            df_result = xetra_etl.transform_report1(df_input)
+
+        # Test after method execution
+        self.assertTrue(df_exp.equals(df_result))
+
     def test_transform_report1_empty_dataframe(self):
         """
         Tests the transform_report1 method with
@@ -391,7 +548,7 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -425,7 +582,7 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -437,8 +594,12 @@ class TestXetraETL(unittest.TestCase):
             with self.assertLogs() as mocked_logs:
                 xetra_etl.load_to_s3(df_input)
                 # Log test after method execution
-                self.assertIn(log1_exp, mocked_logs.output[1])
-                self.assertIn(log2_exp, mocked_logs.output[5])
+                self.assertTrue(any(log1_exp in log for log in mocked_logs.output))
+                self.assertTrue(any(log2_exp in log for log in mocked_logs.output))
+                # The meta file is not read again when it is updated
+                self.assertFalse(
+                    any("Reading file" in log for log in mocked_logs.output)
+                )
         # Test after method execution
         trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[
             0
@@ -449,11 +610,9 @@ class TestXetraETL(unittest.TestCase):
 
         self.assertTrue(df_exp.equals(df_result))
         meta_file = self.s3_bucket_trg.list_files_in_prefix(self.meta_key)[0]
-        df_meta_result = self.s3_bucket_trg.read_csv_to_df_ok(meta_file)
-        self.assertEqual(list(df_meta_result["source_date"]), meta_exp)
-        # Cleanup after test
-        self.trg_s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": trg_file}, {"Key": trg_file}]}
+        df_meta_result = self.s3_bucket_trg.read_parquet_to_df(meta_file)
+        self.assertEqual(
+            list(df_meta_result["source_date"].dt.strftime("%Y-%m-%d")), meta_exp
         )
 
     def test_etl_report1(self):
@@ -470,7 +629,7 @@ class TestXetraETL(unittest.TestCase):
         with patch.object(
             MetaProcess,
             "return_date_list",
-            return_value=[extract_date, extract_date_list],
+            return_value=[extract_date, extract_date_list, pd.DataFrame()],
         ):
             xetra_etl = XetraETL(
                 self.s3_bucket_src,
@@ -481,19 +640,18 @@ class TestXetraETL(unittest.TestCase):
             )
             xetra_etl.etl_report1()
         # Test after method execution
-        trg_file = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)[
-            0
-        ]
+        trg_files = self.s3_bucket_trg.list_files_in_prefix(self.target_config.trg_key)
+        # The whole report is written with a single PUT
+        self.assertEqual(len(trg_files), 1)
+        trg_file = trg_files[0]
         data = self.trg_s3_bucket.Object(key=trg_file).get().get("Body").read()
         out_buffer = BytesIO(data)
         df_result = pd.read_parquet(out_buffer)
         self.assertTrue(df_exp.equals(df_result))
         meta_file = self.s3_bucket_trg.list_files_in_prefix(self.meta_key)[0]
-        df_meta_result = self.s3_bucket_trg.read_csv_to_df_ok(meta_file)
-        self.assertEqual(list(df_meta_result["source_date"]), meta_exp)
-        # Cleanup after test
-        self.trg_s3_bucket.delete_objects(
-            Delete={"Objects": [{"Key": trg_file}, {"Key": trg_file}]}
+        df_meta_result = self.s3_bucket_trg.read_parquet_to_df(meta_file)
+        self.assertEqual(
+            list(df_meta_result["source_date"].dt.strftime("%Y-%m-%d")), meta_exp
         )
 
 
@@ -3,6 +3,18 @@ _summary_: File to store constants
 """
 
 from enum import Enum
+from typing import Final
+
+# Plain module constants for the hot paths, comparing against them
+# skips the Enum member and value descriptor lookups
+CSV_FORMAT: Final = "csv"
+PARQUET_FORMAT: Final = "parquet"
+
+META_DATE_FORMAT: Final = "%Y-%m-%d"
+META_PROCESS_DATE_FORMAT: Final = "%Y-%m-%d %H:%M:%S"
+META_SOURCE_DATE_COLUMN: Final = "source_date"
+META_PROCESS_COL: Final = "datetime_of_processing"
+META_FILE_FORMAT: Final = PARQUET_FORMAT
 
 
 class S3FileTypes(Enum):
@@ -10,8 +22,8 @@ class S3FileTypes(Enum):
     supported file types for S3BucketConnector
     """
 
-    CSV = "csv"
-    PARQUET = "parquet"
+    CSV = CSV_FORMAT
+    PARQUET = PARQUET_FORMAT
 
 
 class MetaProcessFormat(Enum):
@@ -19,8 +31,8 @@ class MetaProcessFormat(Enum):
     formation for MetaProcess class
     """
 
-    META_DATE_FORMAT = "%Y-%m-%d"
-    META_PROCESS_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
-    META_SOURCE_DATE_COLUMN = "source_date"
-    META_PROCESS_COL = "datetime_of_processing"
-    META_FILE_FORMAT = "csv"
+    META_DATE_FORMAT = META_DATE_FORMAT
+    META_PROCESS_DATE_FORMAT = META_PROCESS_DATE_FORMAT
+    META_SOURCE_DATE_COLUMN = META_SOURCE_DATE_COLUMN
+    META_PROCESS_COL = META_PROCESS_COL
+    META_FILE_FORMAT = META_FILE_FORMAT
@@ -2,6 +2,8 @@
 Custom Exceptions
 """
 
+__all__ = ["WrongFormatException", "WrongMetaFileException"]
+
 
 class WrongFormatException(Exception):
     """
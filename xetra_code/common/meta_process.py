@@ -2,8 +2,18 @@
 """
 
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-from xetra_code.common.constants import MetaProcessFormat
+from pandas.api.types import is_datetime64_dtype
+from xetra_code.common.constants import (
+    CSV_FORMAT,
+    META_DATE_FORMAT,
+    META_FILE_FORMAT,
+    META_PROCESS_COL,
+    META_PROCESS_DATE_FORMAT,
+    META_SOURCE_DATE_COLUMN,
+    PARQUET_FORMAT,
+)
 from xetra_code.common.s3 import S3BucketConnector
 from xetra_code.common.custom_exceptions import WrongMetaFileException
 import logging
@@ -13,9 +23,64 @@ from botocore.exceptions import ClientError
 class MetaProcess:
     """_summary_: class for working and updating with the meta file"""
 
+    @staticmethod
+    def _meta_file_format(meta_file_key: str):
+        """
+        Returns the format of the meta file, csv for keys ending with .csv
+        and META_FILE_FORMAT for all the other keys
+
+        Args:
+            meta_file_key (str): This is the key or filename of the meta file in the s3 bucket
+        """
+        if meta_file_key.endswith(f".{CSV_FORMAT}"):
+            return CSV_FORMAT
+        return META_FILE_FORMAT
+
+    @staticmethod
+    def _read_meta_file(meta_bucket: S3BucketConnector, meta_file_key: str):
+        """
+        Reads the meta file in the format given by its key
+
+        If a .parquet meta file does not exist yet, the .csv meta file with
+        the same name written by earlier versions is read instead,
+        update_meta_file then writes its content to the .parquet key
+
+        Args:
+            meta_bucket (S3BucketConnector): S3BucketConnector for the bucket with the meta file
+            meta_file_key (str): This is the key or filename of the meta file in the s3 bucket
+
+        returns:
+            df_meta_file: Pandas DataFrame with the content of the meta file,
+                with the source dates as datetime64
+        """
+        if MetaProcess._meta_file_format(meta_file_key) == CSV_FORMAT:
+            df_meta_file = meta_bucket.read_csv_to_df_ok(meta_file_key)
+        else:
+            try:
+                df_meta_file = meta_bucket.read_parquet_to_df(meta_file_key)
+            except ClientError as e:
+                is_parquet_key = meta_file_key.endswith(f".{PARQUET_FORMAT}")
+                if e.response["Error"]["Code"] != "NoSuchKey" or not is_parquet_key:
+                    raise
+                # Raises NoSuchKey as well if there is no csv meta file either
+                csv_meta_file_key = meta_file_key[: -len(PARQUET_FORMAT)] + CSV_FORMAT
+                df_meta_file = meta_bucket.read_csv_to_df_ok(csv_meta_file_key)
+        # Source dates written as strings by earlier versions are parsed once here,
+        # so the callers always work on a datetime64 column
+        if META_SOURCE_DATE_COLUMN in df_meta_file and not is_datetime64_dtype(
+            df_meta_file[META_SOURCE_DATE_COLUMN]
+        ):
+            df_meta_file[META_SOURCE_DATE_COLUMN] = pd.to_datetime(
+                df_meta_file[META_SOURCE_DATE_COLUMN], format=META_DATE_FORMAT
+            )
+        return df_meta_file
+
     @staticmethod
     def update_meta_file(
-        meta_bucket: S3BucketConnector, meta_file_key: str, extract_date_list: list
+        meta_bucket: S3BucketConnector,
+        meta_file_key: str,
+        extract_date_list: list,
+        df_old: pd.DataFrame = None,
     ):
         """
         This method updates the meta file with the processed Xetra dates
@@ -25,6 +90,9 @@ class MetaProcess:
             meta_bucket (S3BucketConnector): S3BucketConnector for the bucket with the meta file
             meta_file_key (str): This is the key or filename of the meta file in the s3 bucket
             extract_date_list (list): This is a list of dates that are extracted from the source
+            df_old (pd.DataFrame, optional): content of the meta file as returned by return_date_list,
+                an empty DataFrame without columns if there is no meta file.
+                Defaults to None, which reads the meta file from the bucket
         """
         _logger = logging.getLogger(__name__)
 
@@ -33,22 +101,34 @@ class MetaProcess:
             _logger.info("The DataFrame is empty! No file will be written")
             return None
 
-        # Creating an empty Dataframe containing the new files that have been processed
+        # Creating the Dataframe containing the new files that have been processed in one step,
+        # with the source dates as datetime64 and today broadcasted as the processed date
         df_new = pd.DataFrame(
-            columns=[
-                MetaProcessFormat.META_SOURCE_DATE_COLUMN.value,
-                MetaProcessFormat.META_PROCESS_COL.value,
-            ]
-        )
-        df_new[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value] = extract_date_list
-        df_new[MetaProcessFormat.META_PROCESS_COL.value] = datetime.today().strftime(
-            MetaProcessFormat.META_PROCESS_DATE_FORMAT.value
+            {
+                META_SOURCE_DATE_COLUMN: pd.to_datetime(
+                    extract_date_list, format=META_DATE_FORMAT
+                ).normalize(),
+                META_PROCESS_COL: datetime.today().strftime(META_PROCESS_DATE_FORMAT),
+            }
         )
-        try:
-            # Reading the old records in the metafile
+        if df_old is None:
+            try:
+                # Reading the old records in the metafile
+                df_old = MetaProcess._read_meta_file(meta_bucket, meta_file_key)
+            except ClientError as e:
+                # Check if the exception is specifically about the key not existing
+                if e.response["Error"]["Code"] != "NoSuchKey":
+                    raise
+                df_old = pd.DataFrame()
+        if df_old.columns.empty:
+            # If the metafile doesnt exist -> We only use the new data
+            _logger.info(
+                "Old metafile does Not exist, creating and updating meta key file -> %s to the s3 bucket",
+                meta_file_key,
+            )
+            df_all = df_new
+        else:
             # If the meta file exists then union old DataFrane and the new DataFrame
-            df_old = meta_bucket.read_csv_to_df_ok(meta_file_key)
-
             # Now we need to first confirm if the columns in the old and new dataframe are the same
             if list(df_old.columns) != list(df_new.columns):
                 raise WrongMetaFileException
@@ -58,19 +138,9 @@ class MetaProcess:
                 meta_file_key,
             )
 
-            df_all = pd.concat([df_old, df_new])
-        except ClientError as e:
-            # Check if the exception is specifically about the key not existing
-            if e.response["Error"]["Code"] == "NoSuchKey":
-                # If the metafile doesnt exist -> We only use the new data
-                df_all = df_new
-            # Now we write the meta file back to s3
-            _logger.info(
-                "Old metafile does Not exist, creating and updating meta key file -> %s to the s3 bucket",
-                meta_file_key,
-            )
+            df_all = pd.concat([df_old, df_new], ignore_index=True)
         meta_bucket.write_df_to_s3(
-            df_all, meta_file_key, MetaProcessFormat.META_FILE_FORMAT.value
+            df_all, meta_file_key, MetaProcess._meta_file_format(meta_file_key)
         )
         return True
 
@@ -89,70 +159,66 @@ class MetaProcess:
         returns:
           min_date: first date that should be processed
           return_dates: list of all dates from min_date till today
+          df_meta_file: content of the meta file, to be passed on to update_meta_file,
+            an empty DataFrame without columns if there is no meta file
         """
 
         # Now we want to get a list of dates that we are supposed to process
 
-        start_date = datetime.strptime(
-            first_date, MetaProcessFormat.META_DATE_FORMAT.value
-        ).date() - timedelta(days=1)
+        start_date = datetime.strptime(first_date, META_DATE_FORMAT).date() - timedelta(
+            days=1
+        )
         # todays_date_str = '2022-04-26'
         # today = datetime.strptime(
-        #     todays_date_str, MetaProcessFormat.META_DATE_FORMAT.value
+        #     todays_date_str, META_DATE_FORMAT
         # ).date()
         today = datetime.today().date()
+        # Creating an array of dates from first_date - 1 day untill today
+        date_list = np.arange(
+            np.datetime64(start_date, "D"),
+            np.datetime64(today, "D") + 1,
+            dtype="datetime64[D]",
+        )
 
         try:
             # If meta file exists create return_date_list using the content of the meta file
             # Reading meta file
-            df_meta_file = meta_bucket.read_csv_to_df_ok(meta_file_key)
-            # Creating a list of dates from first_date untill today
-            date_list = [
-                (start_date + timedelta(days=x))
-                for x in range(0, (today - start_date).days + 1)
-            ]
-            # Retrieving all the processed dates from the meta file
-            processed_dates = set(
-                pd.to_datetime(
-                    df_meta_file[MetaProcessFormat.META_SOURCE_DATE_COLUMN.value]
-                ).dt.date
+            df_meta_file = MetaProcess._read_meta_file(meta_bucket, meta_file_key)
+            # Retrieving all the processed dates from the typed meta file column
+            # which only needs a cast from datetime64[ns] to datetime64[D]
+            processed_dates = df_meta_file[META_SOURCE_DATE_COLUMN].values.astype(
+                "datetime64[D]"
             )
 
-            # Now lets get the dates that have not been processed
-            # The subtraction operation removes any elements in processed_dates from the first set.
-            dates_missing = set(date_list[1:]) - processed_dates
+            # Now lets get the dates that have not been processed, in ascending order
+            # The days are matched as int64 day numbers
+            candidate_dates = date_list[1:]
+            dates_missing = candidate_dates[
+                ~np.isin(candidate_dates.view("i8"), processed_dates.view("i8"))
+            ]
             # Please note the plan isnt to only process the missing dates because remember in our tansformation we need a percentage change in price
             # from the previous price, so we dont want the change in price from a day checking a day that has already been processed to be missing
             # The plan is just to see that we have missing dates from the minimum date(arg date) to the current date set, so we can process those data
-            if dates_missing:
+            if dates_missing.size:
                 # Determining the earliest date that should be extracted
-                min_date = min(dates_missing) - timedelta(days=1)
+                min_date = dates_missing[0] - np.timedelta64(1, "D")
                 # Creating a list of dates from min_date until today
-                return_dates = [
-                    date.strftime(MetaProcessFormat.META_DATE_FORMAT.value)
-                    for date in date_list
-                    if date >= min_date
-                ]
-                return_min_date = (min_date + timedelta(days=1)).strftime(
-                    MetaProcessFormat.META_DATE_FORMAT.value
-                )
+                return_dates = np.datetime_as_string(
+                    date_list[date_list >= min_date], unit="D"
+                ).tolist()
+                return_min_date = str(np.datetime_as_string(dates_missing[0], unit="D"))
             else:
                 # If all the dates have been processed we just make the return min_date to be a date in the future
                 return_dates = []
                 return_min_date = (
-                    datetime(9999, 12, 1)
-                    .date()
-                    .strftime(MetaProcessFormat.META_DATE_FORMAT.value)
+                    datetime(9999, 12, 1).date().strftime(META_DATE_FORMAT)
                 )
         except ClientError as e:
             # Check if the exception is specifically about the key not existing
             # If there is no existing meta file then we create a date list from the first date -1 day AKA our Start date until today
-            if e.response["Error"]["Code"] == "NoSuchKey":
-                return_dates = [
-                    (start_date + timedelta(days=x)).strftime(
-                        MetaProcessFormat.META_DATE_FORMAT.value
-                    )
-                    for x in range(0, (today - start_date).days + 1)
-                ]
-                return_min_date = first_date
-        return return_min_date, return_dates
+            if e.response["Error"]["Code"] != "NoSuchKey":
+                raise
+            return_dates = np.datetime_as_string(date_list, unit="D").tolist()
+            return_min_date = first_date
+            df_meta_file = pd.DataFrame()
+        return return_min_date, return_dates, df_meta_file
@@ -2,13 +2,95 @@
 """
 
 import logging
-from io import StringIO, BytesIO
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import SEEK_END, BytesIO
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import pyarrow as pa
+import pyarrow.parquet as pq
 from configs.config import configuration
-from xetra_code.common.constants import S3FileTypes
+from xetra_code.common.constants import CSV_FORMAT, PARQUET_FORMAT
 from xetra_code.common.custom_exceptions import WrongFormatException
 import pandas as pd
 
+# Number of parallel GET requests used when reading many objects at once
+MAX_READ_WORKERS = 16
+
+# Seconds a prefix listing is reused before the bucket is listed again
+LIST_CACHE_TTL = 60
+# Maximum number of prefix listings cached per S3BucketConnector
+LIST_CACHE_MAXSIZE = 128
+
+# Maximum number of rows per row group of the written parquet files
+PARQUET_ROW_GROUP_SIZE = 256_000
+# zstd level of the written parquet files
+PARQUET_COMPRESSION_LEVEL = 3
+
+# Botocore client configuration shared by all the S3BucketConnector instances:
+# a connection pool larger than MAX_READ_WORKERS, kept alive TCP connections
+# and adaptive retries for throttled requests
+_BOTO_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 5},
+)
+
+# Transfer configuration for the uploads of whole objects:
+# objects above 8 MB are transferred as 8 MB parts over 8 parallel connections,
+# smaller objects with a single PutObject.
+# Downloads read the first 8 MB of an object with one ranged GET
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+
+@lru_cache(maxsize=8)
+def _get_session(aws_access_key: str, aws_secret_key: str):
+    """
+    Returns a cached boto3 Session for the given credentials,
+    so the credential resolution only happens once per process
+    """
+    return boto3.Session(
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key,
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_client(session: boto3.Session, endpoint_url: str):
+    """
+    Returns a cached s3 client for the given session and endpoint,
+    so connectors to buckets on the same endpoint share one HTTP connection pool
+    """
+    return session.client(
+        service_name="s3", endpoint_url=endpoint_url, config=_BOTO_CONFIG
+    )
+
+
+def _drop_if_no_values(data_frame: pd.DataFrame):
+    """
+    Helper function for the csv read methods
+
+    Returns an empty DataFrame with the csv columns instead of None
+    if the file has no values, so callers can concatenate the results
+    without checking for None
+
+    Args:
+        data_frame (pd.DataFrame): DataFrame parsed from a csv file
+    """
+    if data_frame.isna().all().all():
+        return data_frame.iloc[0:0]
+    return data_frame
+
 
 class S3BucketConnector:
     """_summary_: Class for interacting with s3 Buckets"""
@@ -26,68 +108,275 @@ class S3BucketConnector:
         """
         self._logger = logging.getLogger(__name__)
         self.endpoint_url = endpoint_url
-        self.session = boto3.Session(
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-        )
-        self._s3 = self.session.resource(service_name="s3", endpoint_url=endpoint_url)
-        self._bucket = self._s3.Bucket(bucket)
+        self.session = _get_session(AWS_ACCESS_KEY, AWS_SECRET_KEY)
+        # The low level client skips the resource model dispatch on every call
+        # and is thread safe, unlike the bucket resource
+        self._client = _get_client(self.session, endpoint_url)
+        self._bucket_name = bucket
+        # prefix -> (time of the listing, listed keys)
+        self._list_cache = {}
+        # list_files_in_prefix can be called from many threads at once
+        self._list_cache_lock = threading.Lock()
 
     # @profile
-    def list_files_in_prefix(self, prefix: str):
+    def list_files_in_prefix(self, prefix: str, use_cache: bool = False):
         """_summary_: Listing all files with a prefix on the S3 Bucket
 
+        With use_cache listings are cached per prefix for LIST_CACHE_TTL seconds,
+        for callers listing the same prefix repeatedly. The cache is only cleared
+        by writes through this connector, so files written or deleted by other
+        connectors or processes are missing or still listed until it expires
+
         Args:
             prefix (str): prefix on the S3 buckrt that should be filtered with
+            use_cache (bool, optional): reuse and cache the listing, defaults to False
 
         returns:
             files: list of all the file names containing the prefix in the key
         """
-        files = [obj.key for obj in self._bucket.objects.filter(Prefix=prefix)]
-        return files
+        if use_cache:
+            cached = self._list_cache.get(prefix)
+            if cached is not None and time.monotonic() - cached[0] < LIST_CACHE_TTL:
+                return list(cached[1])
+        files = [
+            obj["Key"]
+            for page in self._client.get_paginator("list_objects_v2").paginate(
+                Bucket=self._bucket_name, Prefix=prefix
+            )
+            for obj in page.get("Contents", [])
+        ]
+        if not use_cache:
+            return files
+        with self._list_cache_lock:
+            if len(self._list_cache) >= LIST_CACHE_MAXSIZE:
+                # Dropping the oldest listing
+                self._list_cache.pop(next(iter(self._list_cache)))
+            self._list_cache[prefix] = (time.monotonic(), files)
+        return list(files)
 
     # @profile
-    def read_csv_to_df_ok(self, key: str, decoding="utf-8", sep=","):
+    def read_csv_to_df_ok(
+        self,
+        key: str,
+        decoding="utf-8",
+        sep=",",
+        usecols: list = None,
+        dtype=None,
+    ):
         """_summary_: This takes in a csv object from a bucket and uses pandas to read it
 
         Args:
             key (_type_): key or name of the file to be read
             decoding (str, optional): Encoding of the data inside the csv file which defaults to "utf-8".
             sep (str, optional): separator of the csv file which defaults to ",".
+            usecols (list, optional): columns to be parsed, defaults to all columns
+            dtype (optional): dtype or dict of column -> dtype passed to the csv parser
+
+        returns:
+            data_frame: Pandas DataFrame containing the data of the csv file,
+                empty if the file has no values
+        """
+
+        self._logger.info(
+            "Reading file %s/%s/%s", self.endpoint_url, self._bucket_name, key
+        )
+
+        # Streaming the body into the parser avoids buffering and decoding copies
+        return _drop_if_no_values(
+            pd.read_csv(
+                self._get_object_body(key),
+                delimiter=sep,
+                encoding=decoding,
+                usecols=usecols,
+                dtype=dtype,
+            )
+        )
+
+    def read_parquet_to_df(self, key: str, columns: list = None):
+        """_summary_: This takes in a parquet object from a bucket and uses pyarrow to read it
+
+        Args:
+            key (str): key or name of the file to be read
+            columns (list, optional): columns to be read, defaults to all columns
+
+        returns:
+            data_frame: Pandas DataFrame containing the data of the parquet file
+        """
+
+        self._logger.info(
+            "Reading file %s/%s/%s", self.endpoint_url, self._bucket_name, key
+        )
+
+        # Only the requested columns are decoded, without any text parsing
+        return pq.read_table(self._download_fileobj(key), columns=columns).to_pandas()
+
+    def read_csv_batch(
+        self, keys: list, decoding="utf-8", sep=",", usecols: list = None, dtype=None
+    ):
+        """_summary_: Reads many csv objects from the bucket in parallel and concatenates them
+
+        Args:
+            keys (list): keys or names of the files to be read
+            decoding (str, optional): Encoding of the data inside the csv files which defaults to "utf-8".
+            sep (str, optional): separator of the csv files which defaults to ",".
+            usecols (list, optional): columns to be parsed, defaults to all columns
+            dtype (optional): dtype or dict of column -> dtype passed to the csv parser
+
+        returns:
+            data_frame: Pandas DataFrame containing the data of all the csv files
+        """
+        if not keys:
+            return pd.DataFrame()
+
+        def read_one(key):
+            self._logger.info(
+                "Reading file %s/%s/%s", self.endpoint_url, self._bucket_name, key
+            )
+            return _drop_if_no_values(
+                pd.read_csv(
+                    self._get_object_body(key),
+                    delimiter=sep,
+                    encoding=decoding,
+                    usecols=usecols,
+                    dtype=dtype,
+                )
+            )
+
+        with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+            data_frames = [
+                data_frame
+                for data_frame in executor.map(read_one, keys)
+                if not data_frame.empty
+            ]
+        if not data_frames:
+            return pd.DataFrame()
+        return pd.concat(data_frames, ignore_index=True)
+
+    def read_dataset(self, prefix: str, columns: list = None, filters=None):
+        """_summary_: Reads all parquet objects with a prefix as one dataset
+
+        Only the requested columns are decoded and row groups that cannot match
+        the filters are skipped based on the parquet statistics
+
+        Args:
+            prefix (str): prefix on the S3 bucket of the parquet files
+            columns (list, optional): columns to be read, defaults to all columns
+            filters (optional): row filters in the format accepted by pyarrow.parquet.read_table
+                e.g [("col1", ">", 1)]
 
         returns:
-            data_frame: Pandas DataFrame containing the data of the csv file
+            data_frame: Pandas DataFrame containing the data of all the parquet files
         """
+        keys = [
+            key
+            for key in self.list_files_in_prefix(prefix)
+            if key.endswith(f".{PARQUET_FORMAT}")
+        ]
+        if not keys:
+            return pd.DataFrame()
 
         self._logger.info(
-            "Reading file %s/%s/%s", self.endpoint_url, self._bucket.name, key
+            "Reading dataset %s/%s/%s", self.endpoint_url, self._bucket_name, prefix
         )
 
-        csv_object = (
-            self._bucket.Object(key=key).get().get("Body").read().decode(decoding)
+        def read_one(key):
+            return pq.read_table(
+                self._download_fileobj(key), columns=columns, filters=filters
+            )
+
+        with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+            tables = list(executor.map(read_one, keys))
+        return pa.concat_tables(tables).to_pandas()
+
+    def _get_object_body(self, key: str):
+        """
+        Helper function for the read methods
+
+        Args:
+            key (str): key or name of the file to be read
+
+        returns:
+            body: file like StreamingBody of the object
+        """
+        return self._client.get_object(Bucket=self._bucket_name, Key=key).get("Body")
+
+    def _download_fileobj(self, key: str):
+        """
+        Helper function for the parquet read methods, which need seekable bytes
+
+        The first GET requests the first multipart_threshold bytes of _TRANSFER_CONFIG,
+        its Content-Range holds the size of the object, so objects up to that size
+        are read with a single request. The rest of a larger object is streamed
+        by a second ranged GET on the calling thread, as the read methods already
+        run in a pool of MAX_READ_WORKERS threads
+
+        Args:
+            key (str): key or name of the file to be read
+
+        returns:
+            buffer: BytesIO with the content of the object, positioned at the start
+        """
+        try:
+            response = self._client.get_object(
+                Bucket=self._bucket_name,
+                Key=key,
+                Range=f"bytes=0-{_TRANSFER_CONFIG.multipart_threshold - 1}",
+            )
+        except ClientError as e:
+            # An empty object has no byte range to return
+            if e.response["Error"]["Code"] != "InvalidRange":
+                raise
+            return BytesIO()
+        buffer = BytesIO()
+        buffer.write(response["Body"].read())
+        content_range = response.get("ContentRange")
+        object_size = (
+            int(content_range.rsplit("/", 1)[1]) if content_range else buffer.tell()
         )
-        data = StringIO(csv_object)
-        dataframe = pd.read_csv(data, delimiter=sep)
-        if not dataframe.empty and not dataframe.isna().all().all():
-            return dataframe
+        if buffer.tell() < object_size:
+            # IfMatch fails the request if the object was replaced in between
+            rest = self._client.get_object(
+                Bucket=self._bucket_name,
+                Key=key,
+                Range=f"bytes={buffer.tell()}-",
+                IfMatch=response["ETag"],
+            )
+            shutil.copyfileobj(rest["Body"], buffer)
+        buffer.seek(0)
+        return buffer
 
-    def __put_object(self, out_buffer: StringIO or BytesIO, key: str, file_format: str):
+    def __put_object(self, out_buffer: BytesIO, key: str, file_format: str):
         """
         Helper function for self.write_df_to_s3()
         Doing this to avoid repetitions
 
         Args:
-            out_buffer: (StringIO | BytesIO): These are the only accepted values
+            out_buffer: (BytesIO): buffer with the encoded file, uploaded without copying it
             key (str): Target key or filename of the file in the bucket
         """
         self._logger.info(
             "Writing file to %s/%s/%s.%s",
             self.endpoint_url,
-            self._bucket.name,
+            self._bucket_name,
             key,
             file_format,
         )
-        self._bucket.put_object(Body=out_buffer.getvalue(), Key=key)
+        buffer_size = out_buffer.seek(0, SEEK_END)
+        out_buffer.seek(0)
+        if buffer_size < _TRANSFER_CONFIG.multipart_threshold:
+            # One request without a transfer manager, failing with a ClientError
+            self._client.put_object(Body=out_buffer, Bucket=self._bucket_name, Key=key)
+        else:
+            # Multipart upload, failing with a boto3 S3UploadFailedError
+            self._client.upload_fileobj(
+                Fileobj=out_buffer,
+                Bucket=self._bucket_name,
+                Key=key,
+                Config=_TRANSFER_CONFIG,
+            )
+        # The cached listings do not contain the new object
+        with self._list_cache_lock:
+            self._list_cache.clear()
 
         return True
 
@@ -105,13 +394,21 @@ class S3BucketConnector:
         if data_frame.empty:
             self._logger.info("The DataFrame is empty! No file will be written")
             return None
-        if file_format == S3FileTypes.CSV.value:
-            output_buffer = StringIO()
-            data_frame.to_csv(output_buffer, index=False)
+        if file_format == CSV_FORMAT:
+            output_buffer = BytesIO()
+            data_frame.to_csv(output_buffer, index=False, encoding="utf-8")
             return self.__put_object(output_buffer, key, file_format)
-        if file_format == S3FileTypes.PARQUET.value:
+        if file_format == PARQUET_FORMAT:
             output_buffer = BytesIO()
-            data_frame.to_parquet(output_buffer, index=False)
+            pq.write_table(
+                pa.Table.from_pandas(data_frame, preserve_index=False),
+                output_buffer,
+                compression="zstd",
+                compression_level=PARQUET_COMPRESSION_LEVEL,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+                use_dictionary=True,
+                write_statistics=True,
+            )
             return self.__put_object(output_buffer, key, file_format)
         self._logger.info(
             "The file format %s is not supported to be written to s3!", file_format
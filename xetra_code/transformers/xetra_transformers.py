@@ -2,10 +2,14 @@
 Xetra ETL Component
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import NamedTuple
-from xetra_code.common.s3 import S3BucketConnector
+from xetra_code.common.s3 import MAX_READ_WORKERS, S3BucketConnector
 import logging
 from xetra_code.common.meta_process import MetaProcess
+from xetra_code.common.constants import PARQUET_FORMAT
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -95,10 +99,17 @@ class XetraETL:
         self.meta_key = meta_key
         self.src_args = src_args
         self.trg_args = trg_args
-        self.extract_date, self.extract_date_list = MetaProcess.return_date_list(
-            self.s3_bucket_src, self.src_args.src_first_extract_date, self.meta_key
+        # The meta file content is kept to update the meta file without reading it again
+        (
+            self.extract_date,
+            self.extract_date_list,
+            self._df_meta,
+        ) = MetaProcess.return_date_list(
+            self.s3_bucket_trg, self.src_args.src_first_extract_date, self.meta_key
         )
 
+        self._extract_date_np = np.datetime64(self.extract_date, "D")
+
         self.meta_update_list = [
             date for date in self.extract_date_list if date >= self.extract_date
         ]
@@ -113,21 +124,45 @@ class XetraETL:
             data_frame: Pandas DataFrame with the extracted data
         """
         self._logger.info("Extracting Xetra source files started...")
-        files = [
-            key
-            for date in self.extract_date_list
-            for key in self.s3_bucket_src.list_files_in_prefix(date)
-        ]
-        # print(f"ALL FILES:\n{files}")
+        # Listing the date prefixes concurrently so the listing round trips overlap
+        with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+            files = [
+                key
+                for keys in executor.map(
+                    self.s3_bucket_src.list_files_in_prefix, self.extract_date_list
+                )
+                for key in keys
+            ]
+            # print(f"ALL FILES:\n{files}")
+
+            # Parquet source files are read with only the source columns
+            parquet_files = [
+                file for file in files if file.endswith(f".{PARQUET_FORMAT}")
+            ]
+            data_frames = list(
+                executor.map(
+                    partial(
+                        self.s3_bucket_src.read_parquet_to_df,
+                        columns=self.src_args.src_columns,
+                    ),
+                    parquet_files,
+                )
+            )
 
-        # Check if files were extracted
-        if not files:
+        # Downloading all the csv files in parallel, parsing only the source columns
+        csv_files = [file for file in files if not file.endswith(f".{PARQUET_FORMAT}")]
+        data_frames.append(
+            self.s3_bucket_src.read_csv_batch(
+                csv_files, usecols=self.src_args.src_columns
+            )
+        )
+
+        # Concatenating all the files once
+        data_frames = [data_frame for data_frame in data_frames if not data_frame.empty]
+        if not data_frames:
             data_frame = pd.DataFrame()
         else:
-            data_frame = pd.concat(
-                [self.s3_bucket_src.read_csv_to_df_ok(file) for file in files],
-                ignore_index=True,
-            )
+            data_frame = pd.concat(data_frames, ignore_index=True)
         self._logger.info("Finished Extracting Xetra source files.")
         # print(f"Dataframe from all files:\n{data_frame}")
         return data_frame
@@ -151,76 +186,95 @@ class XetraETL:
         dataframe = dataframe.loc[:, self.src_args.src_columns]
         # Removing rows with missing values
         dataframe.dropna(inplace=True)
-
-        # Calculating opening price per ISIN and day
-        dataframe[self.trg_args.trg_col_op_price] = (
-            dataframe.sort_values(by=[self.src_args.src_col_time])
-            .groupby([self.src_args.src_col_isin, self.src_args.src_col_date])[
-                self.src_args.src_col_start_price
-            ]
-            .transform("first")
-        )
-        # print(f"Dataframe after WOP:\n{dataframe.head(8)}")
-        # Calculating closing price per ISIN and day
-        dataframe[self.trg_args.trg_col_clos_price] = (
-            dataframe.sort_values(by=[self.src_args.src_col_time])
-            .groupby([self.src_args.src_col_isin, self.src_args.src_col_date])[
-                self.src_args.src_col_start_price
-            ]
-            .transform("last")
-        )
-        # print(f"Dataframe after CP:\n{dataframe.head(8)}")
-
-        # Renaming columns
-        dataframe.rename(
-            columns={
-                self.src_args.src_col_min_price: self.trg_args.trg_col_min_price,
-                self.src_args.src_col_max_price: self.trg_args.trg_col_max_price,
-                self.src_args.src_col_traded_vol: self.trg_args.trg_col_dail_trad_vol,
-            },
-            inplace=True,
+        # Sorting and grouping on the integer codes of a categorical ISIN
+        # is cheaper than on the repeated ISIN strings
+        dataframe[self.src_args.src_col_isin] = dataframe[
+            self.src_args.src_col_isin
+        ].astype("category")
+
+        # Sorting once with a stable sort, so the first and last price per ISIN and day
+        # are the opening and closing prices and the aggregated frame stays ordered
+        # by ISIN and day for the change to the previous closing price
+        dataframe = dataframe.sort_values(
+            by=[
+                self.src_args.src_col_isin,
+                self.src_args.src_col_date,
+                self.src_args.src_col_time,
+            ],
+            kind="mergesort",
+            ignore_index=True,
         )
 
-        # Aggregating per ISIN and day
+        # Aggregating per ISIN and day in one pass
         dataframe = dataframe.groupby(
-            [self.src_args.src_col_isin, self.src_args.src_col_date], as_index=False
+            [self.src_args.src_col_isin, self.src_args.src_col_date],
+            as_index=False,
+            observed=True,
+            sort=False,
         ).agg(
-            {
-                self.trg_args.trg_col_op_price: "min",
-                self.trg_args.trg_col_clos_price: "min",
-                self.trg_args.trg_col_min_price: "min",
-                self.trg_args.trg_col_max_price: "max",
-                self.trg_args.trg_col_dail_trad_vol: "sum",
+            **{
+                self.trg_args.trg_col_op_price: (
+                    self.src_args.src_col_start_price,
+                    "first",
+                ),
+                self.trg_args.trg_col_clos_price: (
+                    self.src_args.src_col_start_price,
+                    "last",
+                ),
+                self.trg_args.trg_col_min_price: (
+                    self.src_args.src_col_min_price,
+                    "min",
+                ),
+                self.trg_args.trg_col_max_price: (
+                    self.src_args.src_col_max_price,
+                    "max",
+                ),
+                self.trg_args.trg_col_dail_trad_vol: (
+                    self.src_args.src_col_traded_vol,
+                    "sum",
+                ),
             }
         )
         # print(f"Dataframe after Aggregation:\n{dataframe.head(8)}")
 
         # Calculating the percentage change in closing prices compared to the previous day
-        dataframe["prev_closing_price"] = (
-            dataframe.sort_values(by=[self.src_args.src_col_date])
-            .groupby([self.src_args.src_col_isin])[self.trg_args.trg_col_clos_price]
-            .shift(1)
+        # The aggregated frame is ordered by ISIN and day, so the previous closing price
+        # is the one of the previous row if that row belongs to the same ISIN
+        closing_prices = dataframe[self.trg_args.trg_col_clos_price].to_numpy(
+            dtype=np.float64
+        )
+        isin_codes = dataframe[self.src_args.src_col_isin].cat.codes.to_numpy()
+        prev_closing_prices = np.full_like(closing_prices, np.nan)
+        prev_closing_prices[1:] = np.where(
+            isin_codes[1:] == isin_codes[:-1], closing_prices[:-1], np.nan
         )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dataframe[self.trg_args.trg_col_ch_prev_clos] = (
+                (closing_prices - prev_closing_prices) / prev_closing_prices * 100
+            )
         # print(f"Dataframe after percent_change:\n{dataframe.head(8)}")
 
-        # Calculating percentage change
-        dataframe[self.trg_args.trg_col_ch_prev_clos] = (
-            (
-                dataframe[self.trg_args.trg_col_clos_price]
-                - dataframe["prev_closing_price"]
-            )
-            / dataframe["prev_closing_price"]
-            * 100
-        )
+        # Rounding the price columns to 2 decimals
+        price_columns = [
+            self.trg_args.trg_col_op_price,
+            self.trg_args.trg_col_clos_price,
+            self.trg_args.trg_col_min_price,
+            self.trg_args.trg_col_max_price,
+            self.trg_args.trg_col_ch_prev_clos,
+        ]
+        dataframe[price_columns] = dataframe[price_columns].round(decimals=2)
 
-        dataframe.drop(columns=["prev_closing_price"], inplace=True)
-        # Rounding to 2 decimals
-        dataframe = dataframe.round(decimals=2)
+        # Restoring the ISIN strings of the report
+        dataframe[self.src_args.src_col_isin] = dataframe[
+            self.src_args.src_col_isin
+        ].astype(object)
 
         # Removing the days before extract_date
-        dataframe = dataframe[dataframe.Date >= self.extract_date].reset_index(
-            drop=True
-        )
+        # The ISO date strings are compared as one datetime64 array
+        dataframe = dataframe[
+            dataframe[self.src_args.src_col_date].values.astype("datetime64[D]")
+            >= self._extract_date_np
+        ].reset_index(drop=True)
 
         self._logger.info("Applying transformations to Xetra source data finished...")
         return dataframe
@@ -244,7 +298,7 @@ class XetraETL:
 
         # Updating meta file
         MetaProcess.update_meta_file(
-            self.s3_bucket_trg, self.meta_key, self.meta_update_list
+            self.s3_bucket_trg, self.meta_key, self.meta_update_list, self._df_meta
         )
         self._logger.info("Xetra meta file successfully updated.")
         return True